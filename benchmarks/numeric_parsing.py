@@ -0,0 +1,76 @@
+"""
+Compares `pyeti.utils.parse_number` with the `typecast_guess` path on
+spreadsheet-style numeric cells.
+
+    python -m benchmarks.numeric_parsing
+"""
+import random
+import sys
+import timeit
+
+from pyeti.utils import parse_number, typecast_guess
+
+ROWS = 200000
+
+
+def _plain_cells(rand):
+    """
+    Cells both parsers understand: integers, grouped integers and decimals.
+    """
+    return [
+        rand.choice([
+            lambda: str(rand.randint(0, 5000)),
+            lambda: '{:,}'.format(rand.randint(1000, 10 ** 7)),
+            lambda: '%.2f' % rand.uniform(-1000, 1000),
+        ])()
+        for _ in range(ROWS)
+    ]
+
+
+def _formatted_cells(rand):
+    """
+    Cells as they come out of accounting spreadsheets. `typecast_guess` gives
+    up on most of these and returns them as strings, so this column shows the
+    cost of actually parsing them rather than a like-for-like comparison.
+    """
+    return [
+        rand.choice([
+            lambda: '${:,.2f}'.format(rand.uniform(0, 10 ** 6)),
+            lambda: '(${:,.2f})'.format(rand.uniform(0, 10 ** 4)),
+            lambda: '%.1f%%' % rand.uniform(0, 100),
+            lambda: '{:,}'.format(rand.randint(1000, 10 ** 7)),
+        ])()
+        for _ in range(ROWS)
+    ]
+
+
+def _parse_all(cells):
+    for cell in cells:
+        try:
+            parse_number(cell)
+        except ValueError:
+            pass
+
+
+def _guess_all(cells):
+    for cell in cells:
+        typecast_guess(cell)
+
+
+def _time(func, cells):
+    return min(timeit.repeat(lambda: func(cells), number=1, repeat=5))
+
+
+def main():
+    rand = random.Random(1234)  # noqa: S311
+
+    for label, cells in [('plain', _plain_cells(rand)), ('formatted', _formatted_cells(rand))]:
+        guess = _time(_guess_all, cells)
+        parse = _time(_parse_all, cells)
+        sys.stdout.write('%-10s typecast_guess %6.3fs  parse_number %6.3fs  (%.2fx)\n' % (
+            label, guess, parse, guess / parse,
+        ))
+
+
+if __name__ == '__main__':
+    main()
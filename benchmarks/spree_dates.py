@@ -0,0 +1,66 @@
+"""
+Compares `parse_spree_datetime` with `dateutil.parser.parse` on the
+timestamps found in store subscription payloads.
+
+    python -m benchmarks.spree_dates
+"""
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from dateutil import parser
+
+from pyeti.eti_django.store.utils import parse_spree_datetime
+
+VALUES = 100000
+
+
+def _spree_strings(rand):
+    """
+    Timestamps as Spree sends them, e.g. `2018-09-01T14:30:00.000Z`.
+    """
+    epoch = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    return [
+        (epoch + timedelta(seconds=rand.randint(0, 4 * 10 ** 8))).strftime('%Y-%m-%dT%H:%M:%S.%%03dZ')
+        % rand.randint(0, 999)
+        for _ in range(VALUES)
+    ]
+
+
+def _other_strings(rand):
+    """
+    Dates, offsets and free-form strings. Only the last need the fallback.
+    """
+    return [
+        rand.choice([
+            lambda: '%04d-%02d-%02d' % (rand.randint(2015, 2030), rand.randint(1, 12), rand.randint(1, 28)),
+            lambda: '2018-09-01T14:30:%02d-05:00' % rand.randint(0, 59),
+            lambda: 'Sep %d 2018' % rand.randint(1, 30),
+        ])()
+        for _ in range(VALUES)
+    ]
+
+
+def _parse_all(func, strings):
+    for string in strings:
+        func(string)
+
+
+def _time(func, strings):
+    return min(timeit.repeat(lambda: _parse_all(func, strings), number=1, repeat=3))
+
+
+def main():
+    rand = random.Random(1234)  # noqa: S311
+
+    for label, strings in [('spree', _spree_strings(rand)), ('mixed', _other_strings(rand))]:
+        dateutil = _time(parser.parse, strings)
+        fast = _time(parse_spree_datetime, strings)
+        sys.stdout.write('%-6s dateutil %6.3fs  parse_spree_datetime %6.3fs  (%.1fx)\n' % (
+            label, dateutil, fast, dateutil / fast,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Drives `Store`, `UsageLicense.sync_from_store` and `SubscriptionMiddleware`
+against a local `SpreeStubServer`, reporting throughput and tail latency.
+
+    python -m benchmarks.store [--latency 0.005] [--error-rate 0.01] [--threads 1,8,32]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from pyeti.eti_django.store.client import Store  # noqa: E402
+from pyeti.eti_django.store.middleware import (  # noqa: E402
+    SubscriptionMiddleware,
+)
+from pyeti.eti_django.store.models import UsageLicense  # noqa: E402
+from pyeti.eti_django.store.testing import SpreeStubServer  # noqa: E402
+
+TOKENS = 200
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.005, help='Stub server latency, in seconds')
+    parser.add_argument('--error-rate', type=float, default=0, help='Share of stub responses that are 503s')
+    parser.add_argument('--threads', default='1,8,32', help='Comma-separated thread counts to run with')
+    parser.add_argument('--calls', type=int, default=400, help='Calls per scenario')
+    args = parser.parse_args()
+
+    with SpreeStubServer(latency=args.latency, error_rate=args.error_rate, seed=1) as server:
+        tokens = ['token-%d' % i for i in range(TOKENS)]
+        for index, token in enumerate(tokens):
+            server.add_subscription(token, lapsed=index % 10 == 0)
+        store = Store(server.url, 'token', backoff=0.01, circuit_breaker_threshold=10 ** 6)
+
+        scenarios = [
+            ('subscription', lambda i: store.subscription(None, tokens[i % TOKENS], show_details=True)),
+            ('sync_from_store', lambda i: _license(tokens[i % TOKENS]).sync_from_store(store)),
+            ('middleware', _middleware_call(tokens)),
+            ('iter_orders', lambda i: sum(1 for _ in store.iter_orders(per_page=50))),
+        ]
+
+        sys.stdout.write('%-16s %7s %10s %9s %9s %9s %7s\n' % (
+            'scenario', 'threads', 'calls/s', 'p50 ms', 'p95 ms', 'p99 ms', 'errors',
+        ))
+        with override_settings(PYETI_STORE_DISABLE_LICENSE_CHECK=False), \
+                mock.patch('pyeti.eti_django.store.models.main_store', store):
+            for label, call in scenarios:
+                for threads in [int(count) for count in args.threads.split(',')]:
+                    throughput, latencies, errors = _run(call, threads, args.calls)
+                    sys.stdout.write('%-16s %7d %10.1f %9.2f %9.2f %9.2f %7d\n' % (
+                        label, threads, throughput,
+                        _percentile(latencies, 50), _percentile(latencies, 95), _percentile(latencies, 99),
+                        errors,
+                    ))
+
+
+def _license(token):
+    usage_license = UsageLicense(token=token, num_seats=1, start_date=timezone.now(), end_date=timezone.now())
+    usage_license.last_synced_at = timezone.now() - timedelta(days=30)
+    return usage_license
+
+
+def _middleware_call(tokens):
+    """
+    Requests whose usage license needs a sync, so every call goes through
+    `sync_from_store` on the main store. Licenses aren't saved.
+    """
+    middleware = SubscriptionMiddleware(mock.Mock())
+    factory = RequestFactory()
+
+    def call(i):
+        request = factory.get('/app/')
+        request.user = User()
+        request.user.usage_license = _license(tokens[i % TOKENS])
+        request.user.usage_license.save = lambda: None
+        middleware.process_request(request)
+
+    return call
+
+
+def _run(call, threads, calls):
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            call(i)
+            failed = False
+        except Exception:
+            # With --error-rate, some calls are meant to fail. Count them
+            # rather than stopping.
+            failed = True
+        return time.perf_counter() - started, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(timed, range(calls)))
+    elapsed = time.perf_counter() - started
+    return calls / elapsed, [latency for latency, _ in results], sum(failed for _, failed in results)
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    index = min(int(round(percent / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index] * 1000
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compares stdlib JSON decoding with `pyeti.eti_django.store.client.decode_json`
+(`orjson`, when installed) on a large listing, and the memory kept per
+subscription as full payload dicts versus `Subscription` objects.
+
+    python -m benchmarks.store_decoding
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+django.setup()
+
+import requests  # noqa: E402
+
+from pyeti.eti_django.store import client  # noqa: E402
+from pyeti.eti_django.store.results import Subscription  # noqa: E402
+
+ORDERS = 5000
+SUBSCRIPTIONS = 20000
+
+
+def main():
+    response = requests.Response()
+    response._content = json.dumps({'orders': [_order(pk) for pk in range(ORDERS)]}).encode('utf-8')
+    response.encoding = 'utf-8'
+
+    stdlib_time = min(timeit.repeat(response.json, number=5, repeat=3)) / 5
+    fast_time = min(timeit.repeat(lambda: client.decode_json(response), number=5, repeat=3)) / 5
+    sys.stdout.write('decode %d orders (%d KB): response.json() %.1fms  decode_json %.1fms (%s, %.2fx)\n' % (
+        ORDERS, len(response.content) // 1024, stdlib_time * 1000, fast_time * 1000,
+        'orjson' if client.orjson is not None else 'stdlib', stdlib_time / fast_time,
+    ))
+
+    payloads = [_subscription(pk) for pk in range(SUBSCRIPTIONS)]
+    dicts_size = _retained(lambda: [json.loads(json.dumps(payload)) for payload in payloads])
+    objects_size = _retained(lambda: [Subscription.from_payload(payload, 200) for payload in payloads])
+    sys.stdout.write('keep %d subscriptions: dicts %.1f MB  Subscription %.1f MB (%.2fx)\n' % (
+        SUBSCRIPTIONS, dicts_size / 2 ** 20, objects_size / 2 ** 20, dicts_size / objects_size,
+    ))
+
+
+def _retained(build):
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def _order(pk):
+    return {
+        'id': pk,
+        'number': 'R%09d' % pk,
+        'state': 'complete',
+        'email': 'user%d@example.com' % pk,
+        'total': '%d.00' % (pk % 500),
+        'completed_at': '2018-09-01T14:30:00.000Z',
+        'line_items': [{'id': pk * 10 + i, 'variant_id': i, 'quantity': 1, 'price': '10.00'} for i in range(3)],
+    }
+
+
+def _subscription(pk):
+    return {
+        'registration_code': 'token-%d' % pk,
+        'num_seats': 30,
+        'start': '2018-09-01T00:00:00.000Z',
+        'end': '2019-09-01T00:00:00.000Z',
+        'order_number': 'R%09d' % pk,
+        'product': {'id': 1, 'name': 'Product', 'description': 'A product ' * 20},
+        'user': {'id': pk, 'email': 'user%d@example.com' % pk},
+    }
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares per-object `record.token()` with `BulkTokenGenerator` for
+generating and validating tokens.
+
+    python -m benchmarks.tokens
+"""
+import os
+import sys
+import timeit
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+django.setup()
+
+from django.db import models  # noqa: E402
+from django.utils import crypto  # noqa: E402
+
+from pyeti.eti_django.tokens import HasSecureTokenMixin  # noqa: E402
+
+RECORDS = 50000
+
+
+class _Record(HasSecureTokenMixin, models.Model):
+
+    class Meta:
+        app_label = 'benchmarks'
+
+
+def main():
+    records = [_Record(token_hash=crypto.get_random_string(length=16)) for _ in range(RECORDS)]
+    tokens = [record.token() for record in records]
+    pairs = list(zip(records, tokens))
+    generator = _Record.token_generator()
+
+    results = [
+        ('generate', lambda: [record.token() for record in records], lambda: generator.generate(records)),
+        ('validate', lambda: [r.token.validate(t) for r, t in pairs], lambda: generator.validate(pairs)),
+    ]
+    for label, single, bulk in results:
+        single_time = min(timeit.repeat(single, number=1, repeat=3))
+        bulk_time = min(timeit.repeat(bulk, number=1, repeat=3))
+        sys.stdout.write('%-9s record.token() %6.3fs  BulkTokenGenerator %6.3fs  (%.2fx)\n' % (
+            label, single_time, bulk_time, single_time / bulk_time,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,12 @@
+import calendar
+from bisect import bisect_left, bisect_right
 from datetime import date, timedelta
 
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
 
 def enumerate_days(start, end=None):
     if end is None:
@@ -8,3 +15,205 @@ def enumerate_days(start, end=None):
     while start <= end:
         yield start
         start += day
+
+
+DAYS = 'days'
+WEEKS = 'weeks'
+MONTHS = 'months'
+UNITS = (DAYS, WEEKS, MONTHS)
+
+
+class DateRange(object):
+    """
+    An inclusive range of dates from `start` to `end` (default: today), like
+    `enumerate_days` but with a few more tricks:
+
+        ```
+        from pyeti.datetime_utils import DateRange, MONTHS
+
+        DateRange(date(2019, 1, 1), date(2019, 12, 31), step=2, unit=MONTHS)
+        DateRange(start, end, business_days=True, holidays=[date(2019, 7, 4)])
+
+        days = DateRange(start, end)
+        len(days)         # computed, not counted
+        days[10]          # the 11th day
+        days[::7]         # every 7th day, as another DateRange
+        reversed(days)    # newest first
+        days.to_numpy()   # a datetime64[D] array
+        ```
+
+    Slices keep the step and filters of the range they came from, with
+    `start` and `end` set to their own first and last dates.
+
+    Iteration is lazy, so a range can be streamed like `enumerate_days`.
+    `len()`, indexing, slicing and `in` don't iterate. With holidays they
+    take O(log n) in the number of holidays.
+
+    `unit` is one of `DAYS`, `WEEKS` or `MONTHS`. Month steps keep the day of
+    the month of `start`, clamped to the length of shorter months. Business
+    day and holiday filtering are only supported with `DAYS`. There, `step`
+    counts the days that are kept.
+    """
+
+    def __init__(self, start, end=None, step=1, unit=DAYS, business_days=False, holidays=None):
+        if end is None:
+            end = date.today()
+        if unit not in UNITS:
+            raise ValueError('%s is not a supported unit.' % unit)
+        if step < 1:
+            raise ValueError('step must be a positive integer.')
+        if unit != DAYS and (business_days or holidays):
+            raise ValueError('Business day and holiday filtering require a unit of days.')
+
+        self.start = start
+        self.end = end
+        # Positions count from the original bounds, which slices keep even
+        # though their own `start` and `end` are narrowed.
+        self.__origin = start
+        self.__limit = end
+        self.unit = unit
+        self.business_days = business_days
+
+        holidays = sorted({
+            holiday.toordinal() for holiday in holidays or ()
+            if not (business_days and holiday.weekday() >= 5)
+        })
+        self.__holidays = holidays
+        self.__positions = range(0, max(self.__count(), 0), step)
+
+    @property
+    def holidays(self):
+        return [date.fromordinal(ordinal) for ordinal in self.__holidays]
+
+    def __len__(self):
+        return len(self.__positions)
+
+    def __bool__(self):
+        return bool(self.__positions)
+
+    def __iter__(self):
+        for position in self.__positions:
+            yield self.__date_at(position)
+
+    def __reversed__(self):
+        for position in reversed(self.__positions):
+            yield self.__date_at(position)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            sliced = object.__new__(self.__class__)
+            sliced.__dict__.update(self.__dict__)
+            sliced.__positions = self.__positions[index]
+            if sliced.__positions:
+                sliced.start = sliced.__date_at(sliced.__positions[0])
+                sliced.end = sliced.__date_at(sliced.__positions[-1])
+            return sliced
+        return self.__date_at(self.__positions[index])
+
+    def __contains__(self, day):
+        position = self.__position_of(day)
+        return position is not None and position in self.__positions
+
+    def __repr__(self):
+        return '<DateRange %s to %s, %d %s>' % (self.start, self.end, len(self), self.unit)
+
+    def reverse(self):
+        """
+        Returns the same dates as a new range, newest first.
+        """
+        return self[::-1]
+
+    def to_numpy(self):
+        """
+        Returns the dates as a NumPy `datetime64[D]` array.
+        """
+        if numpy is None:
+            raise ImportError('NumPy is required for DateRange.to_numpy()')
+
+        if self.unit == MONTHS or self.business_days or self.__holidays:
+            return numpy.array(list(self), dtype='datetime64[D]')
+
+        days_per_position = 7 if self.unit == WEEKS else 1
+        positions = numpy.arange(
+            self.__positions.start, self.__positions.stop, self.__positions.step, dtype=numpy.int64,
+        )
+        return numpy.datetime64(self.__origin, 'D') + positions * days_per_position
+
+    def __count(self):
+        if self.__limit < self.__origin:
+            return 0
+        if self.unit == WEEKS:
+            return (self.__limit - self.__origin).days // 7 + 1
+        if self.unit == MONTHS:
+            months = (self.__limit.year - self.__origin.year) * 12 + self.__limit.month - self.__origin.month
+            if _add_months(self.__origin, months) > self.__limit:
+                months -= 1
+            return months + 1
+
+        start, end = self.__origin.toordinal(), self.__limit.toordinal()
+        holidays = bisect_right(self.__holidays, end) - bisect_left(self.__holidays, start)
+        return self.__days_before(end + 1) - self.__days_before(start) - holidays
+
+    def __date_at(self, position):
+        if self.unit == WEEKS:
+            return self.__origin + timedelta(weeks=position)
+        if self.unit == MONTHS:
+            return _add_months(self.__origin, position)
+        if not (self.business_days or self.__holidays):
+            return self.__origin + timedelta(days=position)
+
+        # Find the `position`th kept day: skip over as many days as there are
+        # holidays between the start and the candidate until that settles.
+        start = self.__origin.toordinal()
+        target = self.__days_before(start) + position
+        holidays_before = bisect_left(self.__holidays, start)
+        skipped = -1
+        holidays = 0
+        while holidays != skipped:
+            skipped = holidays
+            ordinal = self.__day_number_to_ordinal(target + skipped)
+            holidays = bisect_right(self.__holidays, ordinal) - holidays_before
+        return date.fromordinal(ordinal)
+
+    def __position_of(self, day):
+        if not self.__origin <= day <= self.__limit:
+            return None
+        if self.unit == WEEKS:
+            days = (day - self.__origin).days
+            return days // 7 if days % 7 == 0 else None
+        if self.unit == MONTHS:
+            months = (day.year - self.__origin.year) * 12 + day.month - self.__origin.month
+            return months if _add_months(self.__origin, months) == day else None
+
+        ordinal = day.toordinal()
+        if self.business_days and day.weekday() >= 5:
+            return None
+        holiday_index = bisect_left(self.__holidays, ordinal)
+        if holiday_index < len(self.__holidays) and self.__holidays[holiday_index] == ordinal:
+            return None
+        start = self.__origin.toordinal()
+        holidays = holiday_index - bisect_left(self.__holidays, start)
+        return self.__days_before(ordinal) - self.__days_before(start) - holidays
+
+    def __days_before(self, ordinal):
+        """
+        The number of days (or weekdays, for business days) before the given
+        ordinal.
+        """
+        if not self.business_days:
+            return ordinal
+        # Ordinal 1 (0001-01-01) is a Monday.
+        weeks, days = divmod(ordinal - 1, 7)
+        return weeks * 5 + min(days, 5)
+
+    def __day_number_to_ordinal(self, number):
+        if not self.business_days:
+            return number
+        weeks, days = divmod(number, 5)
+        return weeks * 7 + days + 1
+
+
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
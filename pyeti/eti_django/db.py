@@ -1,6 +1,16 @@
+import hashlib
+import logging
+import time
 from contextlib import contextmanager
+from datetime import timedelta
 
-from django.db import connection, transaction
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connection, connections, transaction,
+)
+
+from pyeti.eti_django import signals
+
+logger = logging.getLogger(__name__)
 
 LOCK_ACCESS_SHARE = 'ACCESS SHARE'
 LOCK_ROW_SHARE = 'ROW SHARE'
@@ -16,9 +26,19 @@ LOCKS = (
     LOCK_EXCLUSIVE, LOCK_ACCESS_EXCLUSIVE,
 )
 
+# PostgreSQL's SQLSTATE for both lock_timeout and NOWAIT failures.
+_LOCK_NOT_AVAILABLE = '55P03'
+
+
+class LockNotAvailable(OperationalError):
+    """
+    Raised by `lock` when the table lock couldn't be acquired in time, or at
+    all with `nowait=True`.
+    """
+
 
 @contextmanager
-def lock(model, lock_type):
+def lock(model, lock_type, timeout=None, nowait=False):
     """
     Decorator or context manager for PostgreSQL's table-level lock functionality.
 
@@ -34,18 +54,213 @@ def lock(model, lock_type):
 
         # or
 
-        with lock(MyModel, LOCK_ACCESS_EXCLUSIVE):
+        with lock(MyModel, LOCK_ACCESS_EXCLUSIVE, timeout=timedelta(seconds=5)):
             ...
         ```
 
+    By default, this waits as long as it takes to get the lock. Pass `timeout`
+    (milliseconds or a `timedelta`) to give up after a while, or `nowait=True`
+    to give up straight away. Either way, `LockNotAvailable` is raised and the
+    transaction is rolled back. The timeout only applies to taking the lock,
+    not to the queries run while holding it.
+
+    Signals:
+        - `pyeti.eti_django.signals.lock_finished`: Sent with the model as the
+          sender when the lock is released or given up on. Includes the
+          `lock_type`, whether it was `acquired`, the seconds `waited` for it
+          and the seconds it was `held` (`None` if it wasn't acquired).
+
     PostgreSQL's LOCK Documentation:
     http://www.postgresql.org/docs/latest/interactive/sql-lock.html
     """
     if lock_type not in LOCKS:
-        raise ValueError('%s is not a PostgreSQL supported lock mode.')
+        raise ValueError('%s is not a PostgreSQL supported lock mode.' % lock_type)
+    if isinstance(timeout, timedelta):
+        timeout = timeout.total_seconds() * 1000
+
+    table = model._meta.db_table
+    started = time.monotonic()
 
     with transaction.atomic():
-        connection.cursor().execute(
-            'LOCK TABLE %s IN %s MODE' % (model._meta.db_table, lock_type)
+        cursor = connection.cursor()
+        if timeout is not None:
+            # `SET LOCAL` would last until the end of the transaction, so put
+            # the previous timeout back once the table is locked.
+            cursor.execute("SELECT current_setting('lock_timeout')")
+            previous_timeout = cursor.fetchone()[0]
+            cursor.execute("SET LOCAL lock_timeout = '%dms'" % max(int(timeout), 1))
+        try:
+            cursor.execute('LOCK TABLE %s IN %s MODE%s' % (table, lock_type, ' NOWAIT' if nowait else ''))
+            if timeout is not None:
+                cursor.execute("SELECT set_config('lock_timeout', %s, true)", [previous_timeout])
+        except OperationalError as e:
+            waited = time.monotonic() - started
+            if not _is_lock_not_available(e):
+                raise
+            logger.warning('Gave up waiting for the %s lock on %s after %.3fs', lock_type, table, waited)
+            _lock_finished(model, lock_type, False, waited, None)
+            raise LockNotAvailable(*e.args) from e
+
+        acquired = time.monotonic()
+        waited = acquired - started
+        try:
+            yield
+        finally:
+            held = time.monotonic() - acquired
+            logger.debug('Held the %s lock on %s for %.3fs after waiting %.3fs', lock_type, table, held, waited)
+            _lock_finished(model, lock_type, True, waited, held)
+
+
+def _is_lock_not_available(error):
+    cause = error.__cause__
+    code = getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    return code == _LOCK_NOT_AVAILABLE
+
+
+def _lock_finished(model, lock_type, acquired, waited, held):
+    signals.lock_finished.send(
+        sender=model, lock_type=lock_type, acquired=acquired, waited=waited, held=held,
+    )
+
+
+def claim_batches(queryset, process, batch_size=100):
+    """
+    Work-queue helper: claims up to `batch_size` rows of the queryset at a
+    time with `SELECT ... FOR UPDATE SKIP LOCKED` and calls `process` with
+    each batch as a list. Each batch is claimed and processed in its own
+    transaction, which commits as soon as `process` returns. Rows claimed by
+    other workers are skipped rather than waited on, so several workers can
+    run the same loop over disjoint rows:
+
+        ```
+        from pyeti.eti_django.db import claim_batches
+
+        def sync(batch):
+            for usage_license in batch:
+                usage_license.sync_from_store().save()
+
+        claim_batches(UsageLicense.objects.filter(needs_sync=True), sync, 50)
+        ```
+
+    Rows are claimed in primary key order, and each worker moves past the rows
+    it has already been given, so the loop always ends. Filter the queryset so
+    that finished rows drop out of it, or other workers may pick them up again
+    once they're released.
+
+    If `process` raises, its batch is rolled back and its rows are released
+    for other workers; earlier batches stay committed. If it returns `False`,
+    its batch is committed and no more are claimed. Returns the number of rows
+    processed.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    processed = 0
+
+    while True:
+        with transaction.atomic(using=queryset.db):
+            claimable = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(claimable.select_for_update(skip_locked=True, of=('self',))[:batch_size])
+            if not batch:
+                return processed
+            last_pk = batch[-1].pk
+            keep_going = process(batch)
+        processed += len(batch)
+        if keep_going is False:
+            return processed
+
+
+_BIGINT_MIN = -2 ** 63
+_BIGINT_MAX = 2 ** 63 - 1
+
+
+def advisory_lock_key(key):
+    """
+    Converts a lock key to the 64-bit integer PostgreSQL expects. Integers are
+    used as-is; strings are hashed, so the same string always gives the same
+    key.
+    """
+    if isinstance(key, str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+    if isinstance(key, bool) or not isinstance(key, int):
+        raise TypeError('Advisory lock keys must be integers or strings, not %s.' % type(key).__name__)
+    if not _BIGINT_MIN <= key <= _BIGINT_MAX:
+        raise ValueError('%d does not fit in a 64-bit advisory lock key.' % key)
+    return key
+
+
+@contextmanager
+def advisory_lock(key, shared=False, wait=True, using=DEFAULT_DB_ALIAS):
+    """
+    Decorator or context manager for a session-level PostgreSQL advisory lock.
+    Unlike `lock`, only callers using the same key wait on each other, and no
+    transaction is opened. The lock is released on exit.
+
+    Example:
+        ```
+        from pyeti.eti_django.db import advisory_lock
+
+        @advisory_lock('license-sync')
+        def sync_licenses():
+            ...
+
+        # or
+
+        with advisory_lock('license-%d' % license.pk):
+            ...
+
+        with advisory_lock(license.pk, wait=False) as acquired:
+            if not acquired:
+                return
+            ...
+        ```
+
+    `key` is an integer or a string (see `advisory_lock_key`). With
+    `wait=False`, the lock is only taken if it's free, and the context value
+    says whether it was. With `shared=True`, any number of shared holders can
+    hold the lock at once, but they exclude exclusive holders.
+
+    Raises `TransactionManagementError` inside a transaction: if the block
+    left the transaction aborted, the lock couldn't be released until the
+    connection closed. Use `advisory_xact_lock` there instead.
+
+    PostgreSQL's advisory lock documentation:
+    https://www.postgresql.org/docs/current/explicit-locking.html#ADVISORY-LOCKS
+    """
+    key = advisory_lock_key(key)
+    connection = connections[using]
+    if connection.in_atomic_block:
+        raise transaction.TransactionManagementError(
+            'advisory_lock() cannot be used inside a transaction. Use advisory_xact_lock() instead.'
         )
-        yield
+    suffix = '_shared' if shared else ''
+    acquired = _advisory_lock(connection, '%s_advisory_lock%s' % ('pg' if wait else 'pg_try', suffix), key)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _advisory_lock(connection, 'pg_advisory_unlock%s' % suffix, key)
+
+
+@contextmanager
+def advisory_xact_lock(key, shared=False, wait=True, using=DEFAULT_DB_ALIAS):
+    """
+    Like `advisory_lock`, but opens a transaction (or savepoint) and holds the
+    lock until the outermost transaction ends. This is the safer choice when
+    the work also writes to the database, since the lock can't outlive it.
+    """
+    key = advisory_lock_key(key)
+    function = '%s_advisory_xact_lock%s' % ('pg' if wait else 'pg_try', '_shared' if shared else '')
+    with transaction.atomic(using=using):
+        yield _advisory_lock(connections[using], function, key)
+
+
+def _advisory_lock(connection, function, key):
+    """
+    Calls one of the `pg_*advisory*` functions. The blocking ones return
+    nothing, which counts as success.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT %s(%%s)' % function, [key])
+        result = cursor.fetchone()[0]
+    return result is not False
@@ -0,0 +1,183 @@
+import csv
+import logging
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+from pyeti.eti_django.utils import compile_typecaster
+
+logger = logging.getLogger(__name__)
+
+
+RowError = namedtuple('RowError', ['line_number', 'row', 'error'])
+
+
+class LoadResult(object):
+    """
+    The outcome of a `CSVLoader` run: the number of records created, the rows
+    that could not be loaded, and the CSV columns that did not match a field.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+        self.ignored_columns = []
+
+    def __repr__(self):
+        return '<LoadResult created=%d errors=%d>' % (self.created, len(self.errors))
+
+
+class CSVLoader(object):
+    """
+    Streams rows from a CSV file into a Django model in batches. Only one batch
+    of rows is held in memory at a time.
+
+        ```
+        from pyeti.eti_django.loaders import CSVLoader
+
+        result = CSVLoader(MyModel, batch_size=5000).load('export.csv')
+        result.created   # 123456
+        result.errors    # [RowError(line_number=12, row=[...], error=...)]
+        ```
+
+    The CSV header is matched against each field's name, attname or verbose
+    name (case-insensitively); pass `field_map` to map other headers to field
+    names. Columns that match no field are skipped. Values are typecast with
+    `pyeti.eti_django.utils.compile_typecaster`.
+
+    Rows that fail to typecast or insert are recorded in `LoadResult.errors`
+    and the run carries on. Each batch is inserted in its own transaction; if a
+    batch fails, its rows are retried one at a time to isolate the bad ones.
+
+    With `use_copy=True` on PostgreSQL, batches are written with `COPY ... FROM
+    STDIN` rather than `bulk_create`. This is considerably faster for large
+    files, but primary keys are not set on the loaded instances. Other
+    databases fall back to `bulk_create`.
+    """
+
+    def __init__(self, model, field_map=None, batch_size=1000, use_copy=False, using=DEFAULT_DB_ALIAS):
+        self.__model = model
+        self.__field_map = field_map or {}
+        self.__batch_size = batch_size
+        self.__use_copy = use_copy
+        self.__using = using
+
+    def load(self, source):
+        """
+        Loads the given path or text file-like object. Returns a `LoadResult`.
+        """
+        if isinstance(source, str):
+            with open(source, newline='') as file_:
+                return self.load(file_)
+
+        result = LoadResult()
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header is None:
+            return result
+
+        columns = self.__map_columns(header, result)
+        batch = []
+
+        for row in reader:
+            line_number = reader.line_num
+            if len(row) != len(header):
+                result.errors.append(RowError(
+                    line_number, row,
+                    ValueError('Expected %d columns, got %d' % (len(header), len(row))),
+                ))
+                continue
+
+            try:
+                obj = self.__model(**{
+                    name: cast(row[index]) for index, name, cast in columns
+                })
+            except (TypeError, ValueError, ValidationError) as e:
+                result.errors.append(RowError(line_number, row, e))
+                continue
+
+            batch.append((line_number, row, obj))
+            if len(batch) >= self.__batch_size:
+                self.__insert(batch, result)
+                batch = []
+
+        if batch:
+            self.__insert(batch, result)
+
+        return result
+
+    def __map_columns(self, header, result):
+        fields = {}
+        for field in self.__model._meta.concrete_fields:
+            for key in (field.name, field.attname, str(field.verbose_name)):
+                fields.setdefault(key.lower(), field)
+
+        columns = []
+        for index, column in enumerate(header):
+            try:
+                if column in self.__field_map:
+                    field = self.__model._meta.get_field(self.__field_map[column])
+                else:
+                    field = fields[column.strip().lower()]
+            except (FieldDoesNotExist, KeyError):
+                result.ignored_columns.append(column)
+                continue
+            columns.append((index, field.attname, compile_typecaster(field)))
+        return columns
+
+    def __insert(self, batch, result):
+        objs = [obj for _, _, obj in batch]
+        try:
+            with transaction.atomic(using=self.__using):
+                if self.__use_copy and self.__supports_copy():
+                    self.__copy(objs)
+                else:
+                    self.__model._default_manager.db_manager(self.__using).bulk_create(objs)
+            result.created += len(objs)
+            return
+        except DatabaseError:
+            logger.info('Batch insert into %s failed, retrying row by row', self.__model._meta.db_table)
+
+        for line_number, row, obj in batch:
+            try:
+                with transaction.atomic(using=self.__using):
+                    self.__model._default_manager.db_manager(self.__using).bulk_create([obj])
+                result.created += 1
+            except DatabaseError as e:
+                result.errors.append(RowError(line_number, row, e))
+
+    def __supports_copy(self):
+        if connections[self.__using].vendor != 'postgresql':
+            return False
+        from django.db.backends.postgresql.psycopg_any import is_psycopg3
+        return is_psycopg3
+
+    def __copy(self, objs):
+        connection = connections[self.__using]
+        opts = self.__model._meta
+        fields = [
+            field for field in opts.concrete_fields
+            if not getattr(field, 'generated', False) and (
+                field is not opts.auto_field or any(getattr(obj, field.attname) is not None for obj in objs)
+            )
+        ]
+        sql = 'COPY %s (%s) FROM STDIN' % (
+            connection.ops.quote_name(opts.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+        )
+
+        with connection.cursor() as cursor, connection.wrap_database_errors:
+            with cursor.cursor.copy(sql) as copy:
+                for obj in objs:
+                    copy.write_row([
+                        field.get_db_prep_save(field.pre_save(obj, True), connection)
+                        for field in fields
+                    ])
+
+
+def load_csv(model, source, **kwargs):
+    """
+    Shortcut for `CSVLoader(model, **kwargs).load(source)`.
+    """
+    return CSVLoader(model, **kwargs).load(source)
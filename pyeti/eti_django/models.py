@@ -1,4 +1,11 @@
+import datetime
+
 from django.db import models
+from django.db.models import Case, ExpressionWrapper, Q, Value, When
+from django.db.models.functions import ExtractYear
+
+from pyeti.eti_django.db import claim_batches
+from pyeti.utils import AgeMixin
 
 
 class KeyedModelCache(object):
@@ -68,3 +75,78 @@ class KeyedCacheManager(models.Manager):
     def __init__(self, *args, cache_key=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.cache = KeyedModelCache(self, cache_key=cache_key)
+
+
+def age_expression(birth_date_field, on=None):
+    """
+    A query expression that computes an age in whole years from a date field,
+    the same way `AgeMixin.age_on` does, but in the database. `on` is the
+    reference date and defaults to today. Null birth dates give a null age.
+
+        ```
+        from django.db.models import Count
+
+        Person.objects.annotate(
+            age=age_expression('birth_date', on=date(2018, 9, 1)),
+        ).values('age').annotate(total=Count('pk'))
+        ```
+    """
+    if on is None:
+        on = datetime.date.today()
+
+    later_month = Q(**{'%s__month__gt' % birth_date_field: on.month})
+    later_day = Q(**{'%s__month' % birth_date_field: on.month, '%s__day__gt' % birth_date_field: on.day})
+    birthday_not_reached = Case(
+        When(later_month | later_day, then=Value(1)),
+        default=Value(0),
+    )
+
+    return ExpressionWrapper(
+        Value(on.year) - ExtractYear(birth_date_field) - birthday_not_reached,
+        output_field=models.IntegerField(),
+    )
+
+
+class AgeQuerySet(models.QuerySet):
+    """
+    Queryset counterpart to `pyeti.utils.AgeMixin`, so ages can be filtered and
+    aggregated on without loading every record:
+
+        ```
+        class Person(AgeMixin, models.Model):
+
+            birth_date = models.DateField()
+
+            objects = AgeQuerySet.as_manager()
+
+
+        Person.objects.with_age().filter(age__gte=18)
+        ```
+
+    Uses the model's `BIRTH_DATE_FIELD`.
+    """
+
+    def with_age(self, on=None, name='age'):
+        field = getattr(self.model, 'BIRTH_DATE_FIELD', AgeMixin.BIRTH_DATE_FIELD)
+        return self.annotate(**{name: age_expression(field, on=on)})
+
+
+class WorkQueueQuerySet(models.QuerySet):
+    """
+    Queryset counterpart to `pyeti.eti_django.db.claim_batches`, for models
+    that are worked through by several processes at once:
+
+        ```
+        class Job(models.Model):
+
+            done = models.BooleanField(default=False)
+
+            objects = WorkQueueQuerySet.as_manager()
+
+
+        Job.objects.filter(done=False).claim_batches(run_jobs, 50)
+        ```
+    """
+
+    def claim_batches(self, process, batch_size=100):
+        return claim_batches(self, process, batch_size=batch_size)
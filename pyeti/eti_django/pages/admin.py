@@ -3,6 +3,7 @@ from django.utils.translation import get_language_info, gettext as _
 
 from .forms import PlaceholderForm
 from .models import Placeholder
+from .utils import get_missing_placeholders
 
 
 class LanguagesFieldListFilter(admin.AllValuesFieldListFilter):
@@ -45,3 +46,12 @@ class PlaceholderAdmin(admin.ModelAdmin):
     def language(self, obj):
         return get_language_info(obj.langcode)['name_translated']
     language.short_description = 'Language'
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = extra_context or {}
+        extra_context['missing_placeholders'] = [
+            (get_language_info(langcode)['name_translated'], names)
+            for langcode, names in get_missing_placeholders().items()
+            if names
+        ]
+        return super().changelist_view(request, extra_context=extra_context)
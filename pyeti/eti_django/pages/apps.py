@@ -6,3 +6,7 @@ class PagesConfig(AppConfig):
     name = 'pyeti.eti_django.pages'
     verbose_name = _('Pages')
     default_auto_field = 'django.db.models.AutoField'
+
+    def ready(self):
+        from .utils import placeholder_choices
+        placeholder_choices.warm()
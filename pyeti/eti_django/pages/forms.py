@@ -4,7 +4,7 @@ from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
 
 from .models import Placeholder
-from .utils import get_placeholders
+from .utils import placeholder_choices
 
 
 def get_content_widget():
@@ -24,8 +24,8 @@ class PlaceholderForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.fields['name'].choices = [(p, p) for p in sorted(get_placeholders())]
-        self.fields['langcode'].choices = settings.LANGUAGES
+        self.fields['name'].choices = placeholder_choices.names
+        self.fields['langcode'].choices = placeholder_choices.languages
         self.fields['langcode'].initial = settings.LANGUAGE_CODE
 
     class Meta:
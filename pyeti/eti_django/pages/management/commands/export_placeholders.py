@@ -0,0 +1,27 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from pyeti.eti_django.pages.utils import (
+    PLACEHOLDER_FORMATS, export_placeholders, guess_placeholder_format,
+)
+
+
+class Command(BaseCommand):
+    help = 'Exports placeholder content as JSON Lines or CSV.'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help='File to write to, or "-" for stdout.')
+        parser.add_argument('--format', choices=PLACEHOLDER_FORMATS, help='Defaults to the file extension, or jsonl.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format_ = options['format'] or guess_placeholder_format(path)
+
+        if path == '-':
+            count = export_placeholders(sys.stdout, format_)
+        else:
+            with open(path, 'w', newline='') as file_:
+                count = export_placeholders(file_, format_)
+
+        self.stderr.write('Exported %d placeholder(s)' % count)
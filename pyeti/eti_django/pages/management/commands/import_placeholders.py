@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pyeti.eti_django.pages.utils import (
+    PLACEHOLDER_FORMATS, guess_placeholder_format, import_placeholders,
+)
+
+
+class Command(BaseCommand):
+    help = 'Imports placeholder content from JSON Lines or CSV, updating existing placeholders.'  # noqa: A003
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read from, or "-" for stdin.')
+        parser.add_argument('--format', choices=PLACEHOLDER_FORMATS, help='Defaults to the file extension, or jsonl.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format_ = options['format'] or guess_placeholder_format(path)
+
+        try:
+            if path == '-':
+                count = import_placeholders(sys.stdin, format_, batch_size=options['batch_size'])
+            else:
+                with open(path, newline='') as file_:
+                    count = import_placeholders(file_, format_, batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.stdout.write('Imported %d placeholder(s)' % count)
@@ -1,18 +1,30 @@
+import csv
+import json
+import logging
 import os
 import re
 
 from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
 from django.template.loaders.app_directories import get_app_template_dirs
 
+from .models import Placeholder
+
+logger = logging.getLogger(__name__)
+
 placeholder_re = re.compile(r"{% placeholder\s+('|\")(?P<name>[^\1]+?)\1[^}]+%}")
 
 
 def get_placeholders():
     placeholders = set()
-    for template_dir in (settings.TEMPLATES[0].get('DIRS', tuple()) + get_app_template_dirs('templates')):
+    dirs = tuple(settings.TEMPLATES[0].get('DIRS', ())) if settings.TEMPLATES else ()
+    for template_dir in dirs + get_app_template_dirs('templates'):
         for dirname, dirnames, filenames in os.walk(template_dir):
             for filename in filenames:
-                with open(os.path.join(dirname, filename)) as file_:
+                with open(os.path.join(dirname, filename), encoding='utf-8', errors='replace') as file_:
                     for line in file_:
                         placeholders.update(parse_placeholders(line))
     return placeholders
@@ -23,3 +35,174 @@ def parse_placeholders(string):
     Given a string, return a list of `{% placeholder %}` tags found.
     """
     return [m.group('name') for m in placeholder_re.finditer(string)]
+
+
+class PlaceholderChoices(object):
+    """
+    Memoized form choices for placeholder names and languages. Discovering
+    placeholders means walking every template directory, so the result is
+    computed once and reused until `reset()` is called.
+
+        ```
+        from pyeti.eti_django.pages.utils import placeholder_choices
+
+        placeholder_choices.names      # [('My Page Content', 'My Page Content'), ...]
+        placeholder_choices.languages  # settings.LANGUAGES
+        placeholder_choices.reset()
+        ```
+
+    The pages app warms this cache when Django starts up. If placeholders
+    can't be discovered then, the error is logged and discovery is tried again
+    the first time the names are needed.
+    """
+
+    def __init__(self):
+        self.__names = None
+        self.__languages = None
+
+    @property
+    def names(self):
+        if self.__names is None:
+            self.__names = [(p, p) for p in sorted(get_placeholders())]
+        return self.__names
+
+    @property
+    def languages(self):
+        if self.__languages is None:
+            self.__languages = list(settings.LANGUAGES)
+        return self.__languages
+
+    def warm(self):
+        try:
+            self.names
+            self.languages
+        except Exception:
+            logger.exception('Could not discover placeholders')
+        return self
+
+    def reset(self):
+        self.__names = None
+        self.__languages = None
+        return self
+
+
+placeholder_choices = PlaceholderChoices()
+
+
+@receiver(setting_changed)
+def reset_placeholder_choices(setting, **kwargs):
+    if setting in ('LANGUAGES', 'TEMPLATES'):
+        placeholder_choices.reset()
+
+
+def get_missing_placeholders(queryset=None):
+    """
+    Returns a dict mapping each configured language code to a sorted list of
+    discovered placeholder names that have no `Placeholder` record in that
+    language. Existing records are fetched with a single aggregate query.
+    """
+    if queryset is None:
+        queryset = Placeholder.objects.all()
+
+    names = [name for name, _ in placeholder_choices.names]
+    existing = dict(
+        queryset.filter(name__in=names)
+        .order_by()
+        .values('langcode')
+        .annotate(names=ArrayAgg('name'))
+        .values_list('langcode', 'names')
+    )
+
+    return {
+        langcode: sorted(set(names) - set(existing.get(langcode, [])))
+        for langcode, _ in placeholder_choices.languages
+    }
+
+
+PLACEHOLDER_FORMATS = ('jsonl', 'csv')
+_PLACEHOLDER_FIELDS = ('name', 'langcode', 'content')
+
+
+def guess_placeholder_format(path):
+    """
+    Guesses the import/export format from a file name, defaulting to JSON Lines.
+    """
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def export_placeholders(file_, format_='jsonl', queryset=None):
+    """
+    Writes placeholder content to the given text file object as JSON Lines or
+    CSV, one record per line. Records are streamed from the database rather
+    than loaded all at once. Returns the number of records written.
+    """
+    if format_ not in PLACEHOLDER_FORMATS:
+        raise ValueError('%s is not a supported placeholder format.' % format_)
+    if queryset is None:
+        queryset = Placeholder.objects.all()
+
+    rows = queryset.order_by('name', 'langcode').values_list(*_PLACEHOLDER_FIELDS).iterator()
+
+    if format_ == 'csv':
+        writer = csv.writer(file_)
+        writer.writerow(_PLACEHOLDER_FIELDS)
+        write = writer.writerow
+    else:
+        def write(row):
+            file_.write(json.dumps(dict(zip(_PLACEHOLDER_FIELDS, row))) + '\n')
+
+    count = 0
+    for row in rows:
+        write(row)
+        count += 1
+    return count
+
+
+def import_placeholders(file_, format_='jsonl', batch_size=500):
+    """
+    Reads placeholder content written by `export_placeholders` and upserts it
+    by natural key (`name`, `langcode`) in batches, inside a single
+    transaction. The placeholder cache is reset once when the import finishes
+    instead of once per record. Returns the number of records imported.
+    """
+    if format_ not in PLACEHOLDER_FORMATS:
+        raise ValueError('%s is not a supported placeholder format.' % format_)
+
+    if format_ == 'csv':
+        records = csv.DictReader(file_)
+    else:
+        records = (json.loads(line) for line in file_ if line.strip())
+
+    count = 0
+    batch = {}
+    with transaction.atomic():
+        for record in records:
+            if not record.get('name'):
+                raise ValueError('Placeholder record %d has no name.' % (count + 1))
+            langcode = record.get('langcode')
+            placeholder = Placeholder(
+                name=record['name'],
+                # A blank language code is valid, so only default a missing one.
+                langcode=settings.LANGUAGE_CODE if langcode is None else langcode,
+                content=record.get('content') or '',
+            )
+            batch[placeholder.natural_key()] = placeholder
+            count += 1
+            if len(batch) >= batch_size:
+                _upsert_placeholders(batch.values())
+                batch = {}
+
+        if batch:
+            _upsert_placeholders(batch.values())
+
+    Placeholder.objects.cache.reset()
+    return count
+
+
+def _upsert_placeholders(placeholders):
+    Placeholder.objects.bulk_create(
+        placeholders,
+        update_conflicts=True,
+        unique_fields=('name', 'langcode'),
+        update_fields=('content', 'edited_at'),
+    )
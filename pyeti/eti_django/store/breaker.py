@@ -0,0 +1,72 @@
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker(object):
+    """
+    Stops calling a failing service for a while. After `failure_threshold`
+    failures in a row, the circuit opens and `allow_request` returns `False`
+    for `cooldown` seconds. After that, one trial request is let through: if
+    it succeeds the circuit closes again, and if it fails the circuit stays
+    open for another cooldown.
+
+    State is kept in memory, so each process has its own breaker. It's safe to
+    share between threads.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.__lock = threading.Lock()
+        self.__failures = 0
+        self.__opened_at = None
+        self.__trial_running = False
+
+    @property
+    def state(self):
+        with self.__lock:
+            return self.__state()
+
+    def allow_request(self):
+        """
+        Returns whether a request should be made. When the cooldown is over,
+        only the first caller gets `True` until its outcome is recorded.
+        """
+        with self.__lock:
+            state = self.__state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self.__trial_running:
+                self.__trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__trial_running = False
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__trial_running or self.__failures >= self.failure_threshold:
+                self.__opened_at = self._now()
+            self.__trial_running = False
+
+    def reset(self):
+        self.record_success()
+
+    def _now(self):
+        return time.monotonic()
+
+    def __state(self):
+        if self.__opened_at is None:
+            return CLOSED
+        if self._now() - self.__opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
@@ -0,0 +1,170 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+
+# Returned by a `ResponseCache.get_or_fetch` fetcher when the store answers a
+# conditional request with `304 Not Modified`.
+NOT_MODIFIED = object()
+
+
+class CachedResponse(object):
+    """
+    A decoded response along with its status code and its `ETag` and
+    `Last-Modified` validators.
+    """
+
+    __slots__ = ('data', 'status_code', 'etag', 'last_modified', 'fresh_until')
+
+    def __init__(self, data, status_code=200, etag=None, last_modified=None, fresh_until=None):
+        self.data = data
+        self.status_code = status_code
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh_until = fresh_until
+
+    @property
+    def is_fresh(self):
+        return self.fresh_until is not None and time.time() < self.fresh_until
+
+    @property
+    def is_cacheable(self):
+        return self.data is not None and 200 <= self.status_code < 300
+
+    @property
+    def has_validators(self):
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """
+    Caches decoded JSON responses from the store in one of Django's caches.
+    `ttls` maps the names of cacheable `Store` endpoints (`products`,
+    `product`, `webinars` and `webinar`) to how many seconds to keep their
+    responses; endpoints that aren't listed aren't cached.
+
+    Keys are built from the request path and its parameters (including the
+    product `group`), sorted so that the same request always gets the same
+    key. When several threads miss on the same key at once, only one of them
+    calls the store and the others wait for its result. This coalescing is per
+    process.
+
+    Responses with an `ETag` or `Last-Modified` header are kept for another
+    `revalidate_for` seconds after they expire. In that time, the next request
+    for them is made conditional, and a `304 Not Modified` answer renews the
+    cached response instead of downloading and decoding it again.
+    """
+
+    def __init__(self, ttls, cache_alias='default', key_prefix='pyeti.store', revalidate_for=86400):
+        self.ttls = dict(ttls)
+        self.revalidate_for = revalidate_for
+        self.__cache_alias = cache_alias
+        self.__key_prefix = key_prefix
+        self.__locks = {}
+        self.__locks_lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.__cache_alias]
+
+    def caches_endpoint(self, endpoint):
+        return endpoint in self.ttls
+
+    def get_or_fetch(self, endpoint, path, params, fetch):
+        """
+        Returns the cached response for the request, or fetches and caches it.
+        `fetch` is called with the conditional request headers for an expired
+        response (or an empty dict), and returns a `CachedResponse` or
+        `NOT_MODIFIED`. Error responses, and responses whose `data` is `None`
+        because they couldn't be decoded, are returned without being cached.
+        """
+        key = self.make_key(path, params)
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_fresh:
+            return entry.data
+
+        with self.__lock_for(key):
+            entry = self.cache.get(key)
+            if entry is not None and entry.is_fresh:
+                return entry.data
+
+            result = fetch(entry.conditional_headers() if entry is not None else {})
+            if result is NOT_MODIFIED and entry is not None:
+                result = entry
+            elif result is NOT_MODIFIED:
+                return None
+            elif not result.is_cacheable:
+                return result.data
+
+            ttl = self.ttls[endpoint]
+            result.fresh_until = time.time() + ttl
+            self.cache.set(key, result, ttl + self.revalidate_for if result.has_validators else ttl)
+            return result.data
+
+    def invalidate(self, path, params):
+        self.cache.delete(self.make_key(path, params))
+
+    def clear(self):
+        """
+        Invalidates every cached response by moving on to a new generation of
+        keys. The old entries expire on their own.
+        """
+        try:
+            self.cache.incr(self.__generation_key)
+        except ValueError:
+            self.cache.add(self.__generation_key, 1, None)
+
+    def make_key(self, path, params):
+        query = urlencode(sorted((str(k), _normalize(v)) for k, v in params.items() if v is not None), doseq=True)
+        digest = hashlib.sha256(('%s?%s' % (path, query)).encode('utf-8')).hexdigest()
+        return '%s:%s:%s' % (self.__key_prefix, self.cache.get(self.__generation_key, 0), digest)
+
+    @property
+    def __generation_key(self):
+        return '%s:generation' % self.__key_prefix
+
+    def __lock_for(self, key):
+        return _KeyLock(self.__locks, self.__locks_lock, key)
+
+
+class _KeyLock(object):
+    """
+    A lock for one cache key, kept in a shared dict only while some thread
+    holds or waits for it.
+    """
+
+    def __init__(self, locks, locks_lock, key):
+        self.__locks = locks
+        self.__locks_lock = locks_lock
+        self.__key = key
+
+    def __enter__(self):
+        with self.__locks_lock:
+            entry = self.__locks.setdefault(self.__key, [threading.Lock(), 0])
+            entry[1] += 1
+        self.__lock = entry[0]
+        self.__lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self.__lock.release()
+        with self.__locks_lock:
+            entry = self.__locks[self.__key]
+            entry[1] -= 1
+            if not entry[1]:
+                del self.__locks[self.__key]
+
+
+def _normalize(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    return str(value)
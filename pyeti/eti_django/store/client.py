@@ -1,8 +1,26 @@
+import contextlib
+import functools
 import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from django.conf import settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from . import signals
+from .breaker import CircuitBreaker
+from .cache import NOT_MODIFIED, CachedResponse, ResponseCache
+from .exceptions import PageError, StoreUnavailable
+from .metrics import StoreMetrics
+from .ratelimit import TokenBucket, parse_retry_after
+
 requests.packages.urllib3.disable_warnings()
 
 logger = logging.getLogger(__name__)
@@ -12,10 +30,90 @@ SUBSCRIPTION_OK_STATUS_CODE = 200
 LAPSED_SUBSCRIPTION_STATUS_CODE = 211
 NO_SUBSCRIPTION_STATUS_CODE = 212
 
+# Responses worth retrying a GET for: the store or its proxy is struggling.
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+TOO_MANY_REQUESTS_STATUS_CODE = 429
+# Longer Retry-After waits than this (in seconds) aren't waited out.
+MAX_RETRY_AFTER = 60
+
+
+def decode_json(response):
+    """
+    Decodes a response's JSON body, with `orjson` if it's installed. Raises
+    `ValueError` if the body isn't JSON.
+    """
+    content = response.content
+    if orjson is not None and isinstance(content, bytes):
+        return orjson.loads(content)
+    return response.json()
+
+
+def _instrumented(method):
+    """
+    Labels the requests made by an API method with the method's name, for
+    instrumentation.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        previous = getattr(self._local, 'endpoint', None)
+        self._local.endpoint = method.__name__
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._local.endpoint = previous
+    return wrapper
+
 
 class Store(object):
-
-    def __init__(self, url, token, group=None):
+    """
+    Client for the store's API.
+
+    Requests share a connection pool. `connect_timeout` and `read_timeout` are
+    in seconds. GET requests are retried up to `retries` times on connection
+    errors (including connect timeouts) and 502/503/504 responses, waiting a
+    random time of up to `backoff * 2 ** attempt` seconds in between. Other
+    methods aren't idempotent, so they are never retried.
+
+    Read timeouts aren't retried, so a store that doesn't answer holds a call
+    up for at most `connect_timeout + read_timeout` seconds, plus `retries *
+    connect_timeout` and the backoff if connecting failed first. Only slow
+    502/503/504 responses, each arriving just short of `read_timeout`, can
+    hold it up for longer.
+
+    Calls that still fail are counted by a `CircuitBreaker`. Once the store has
+    failed `circuit_breaker_threshold` calls in a row, calls raise
+    `StoreUnavailable` straight away for `circuit_breaker_cooldown` seconds
+    instead of waiting on it.
+
+    `rate_limit` caps the calls made per second, with bursts of up to
+    `rate_limit_burst` calls, and `max_concurrency` caps how many calls are in
+    flight at once. Both are shared by every thread using the client. A `429
+    Too Many Requests` response is retried for any method, and holds back
+    every call for as long as its `Retry-After` header asks (up to
+    `MAX_RETRY_AFTER` seconds).
+
+    Each call's duration, status code, response size and retries are
+    recorded in `metrics`, a `StoreMetrics`, under the name of the API method
+    that made it (e.g. `subscription` or `orders`). They're also sent with the
+    `pyeti.eti_django.store.signals.store_request_finished` signal, along with
+    the HTTP `method` and any `error` raised, for other metrics backends.
+
+    Pass a `ResponseCache` as `cache` to cache the responses of the catalog
+    endpoints: `products`, `product`, `webinars` and `webinar`. Use
+    `invalidate` and `invalidate_all` when the catalog changes.
+    """
+
+    # The paths of the endpoints that can be cached.
+    CACHEABLE_PATHS = {
+        'products': 'products',
+        'product': 'products/%s',
+        'webinars': 'webinars/all',
+        'webinar': 'webinars/%s',
+    }
+
+    def __init__(self, url, token, group=None, connect_timeout=3.05, read_timeout=10, retries=2,
+                 backoff=0.25, circuit_breaker_threshold=5, circuit_breaker_cooldown=30, cache=None,
+                 rate_limit=None, rate_limit_burst=None, max_concurrency=None):
         self._endpoint = '%sapi/v1/' % url
         self._headers = {
             'X-Spree-Token': token,
@@ -23,6 +121,17 @@ class Store(object):
             'Accept': 'application/json',
         }
         self._group = group
+        self._timeout = (connect_timeout, read_timeout)
+        self._retries = retries
+        self._backoff = backoff
+        self._session = requests.Session()
+        self.circuit_breaker = CircuitBreaker(circuit_breaker_threshold, circuit_breaker_cooldown)
+        self.cache = cache
+        self.rate_limiter = TokenBucket(rate_limit, rate_limit_burst)
+        self.metrics = StoreMetrics()
+        self._local = threading.local()
+        self._concurrency = threading.BoundedSemaphore(max_concurrency) if max_concurrency \
+            else contextlib.nullcontext()
 
     ###########
     # Begin API
@@ -32,6 +141,7 @@ class Store(object):
     # Subscriptions
     ###############
 
+    @_instrumented
     def subscription(self, user_id, registration_code, show_details=False, **params):
         path = 'account_subscriptions'
         if user_id:
@@ -42,6 +152,55 @@ class Store(object):
             **params
         ))
 
+    @_instrumented
+    def get_subscription(self, registration_code, user_id=None, extra_fields=()):
+        """
+        Looks up a subscription by registration code and returns it as a
+        `pyeti.eti_django.store.results.Subscription`, or `None` if the store
+        doesn't know the code. Lapsed subscriptions are returned too; check
+        `is_lapsed`.
+        """
+        from .results import Subscription
+
+        response = self.subscription(user_id, registration_code, show_details=True)
+        if response.status_code == NO_SUBSCRIPTION_STATUS_CODE:
+            return None
+        return Subscription.from_response(response, registration_code=registration_code, extra_fields=extra_fields)
+
+    def get_subscriptions(self, registration_codes, extra_fields=(), max_workers=8, return_exceptions=False):
+        """
+        Looks up many subscriptions at once. Returns a dict of each
+        registration code to its `Subscription`, or to
+        `pyeti.eti_django.store.results.SUBSCRIPTION_NOT_FOUND` if the store
+        doesn't know it.
+
+        The store's API looks up one code per request, so the lookups run on
+        up to `max_workers` threads sharing the connection pool. They still go
+        through the client's rate limiter and concurrency cap. If any lookup
+        fails, its exception is raised once the rest have finished. With
+        `return_exceptions=True`, the exception is returned for that code
+        instead, so that one failure doesn't throw away the other lookups.
+        """
+        from .results import SUBSCRIPTION_NOT_FOUND
+
+        codes = list(dict.fromkeys(registration_codes))
+        if not codes:
+            return {}
+
+        def lookup(code):
+            try:
+                subscription = self.get_subscription(code, extra_fields=extra_fields)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+            return SUBSCRIPTION_NOT_FOUND if subscription is None else subscription
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(codes))) as executor:
+            futures = [executor.submit(lookup, code) for code in codes]
+        return {code: future.result() for code, future in zip(codes, futures)}
+
+    @_instrumented
     def subscriptions_by_user(self, user_id, **params):
         return self._do_json('users/%s/account_subscriptions' % user_id, params=self._params(**params))
 
@@ -49,16 +208,19 @@ class Store(object):
     # Products
     ##########
 
+    @_instrumented
     def products(self, **params):
-        return self._do_json('products', params=self._params(*params))
+        return self._do_cached_json('products', params=self._params(**params))
 
+    @_instrumented
     def product(self, pk, **params):
-        return self._do_json('products/%s' % pk, params=self._params(**params))
+        return self._do_cached_json('product', pk, params=self._params(**params))
 
     #######
     # Users
     #######
 
+    @_instrumented
     def users(self, **params):
         """
         Filters use the `ransack` gem syntax:
@@ -66,9 +228,18 @@ class Store(object):
         """
         return self._do_json('users', params=self._params(**params))
 
+    def iter_users(self, per_page=100, prefetch=False, **params):
+        """
+        Yields every user matching the filters, one page at a time. See
+        `iter_pages`.
+        """
+        return self.iter_pages(self.users, 'users', per_page=per_page, prefetch=prefetch, **params)
+
+    @_instrumented
     def user(self, pk, **params):
         return self._do_json('users/%s' % pk, params=self._params(**params))
 
+    @_instrumented
     def create_user(self, email, password, **data):
         data['email'] = email
         data['password'] = password
@@ -78,26 +249,39 @@ class Store(object):
     # Orders
     ########
 
+    @_instrumented
     def orders(self, **params):
         return self._do_json('orders', params=self._params(**params))
 
+    def iter_orders(self, per_page=100, prefetch=False, **params):
+        """
+        Yields every order matching the filters, one page at a time. See
+        `iter_pages`.
+        """
+        return self.iter_pages(self.orders, 'orders', per_page=per_page, prefetch=prefetch, **params)
+
+    @_instrumented
     def order(self, pk, **params):
         return self._do_json('orders/%s' % pk, params=self._params(**params))
 
+    @_instrumented
     def orders_by_user(self, user_id, **params):
         return self._do_json('users/%s/orders' % user_id, params=self._params(**params))
 
+    @_instrumented
     def current_order(self, user_id, **params):
         return self._do_json('orders/current', params=self._params(
             user_id=user_id,
             **params
         ))
 
+    @_instrumented
     def create_order(self, user_id, email, **data):
         data['user_id'] = user_id
         data['email'] = email
         return self._do_json('orders', method='post', json={'order': data})
 
+    @_instrumented
     def update_order(self, pk, order_token, line_items):
         return self._do_json(
             'orders/%s' % pk,
@@ -106,6 +290,7 @@ class Store(object):
             json=line_items,
         )
 
+    @_instrumented
     def create_line_item(self, order_id, order_token, product_id, quantity=1, **data):
         data['variant_id'] = product_id
         data['quantity'] = quantity
@@ -120,52 +305,233 @@ class Store(object):
     # Webinars
     ##########
 
+    @_instrumented
     def webinars(self, **params):
-        return self._do_json('webinars/all', params=self._params(**params))
+        return self._do_cached_json('webinars', params=self._params(**params))
 
+    @_instrumented
     def webinar(self, pk, **params):
-        return self._do_json('webinars/%s' % pk, params=self._params(**params))
+        return self._do_cached_json('webinar', pk, params=self._params(**params))
 
+    @_instrumented
     def webinar_registrations(self, **params):
         return self._do_json('webinar_registrations', params=self._params(**params))
 
+    def iter_webinar_registrations(self, per_page=100, prefetch=False, **params):
+        """
+        Yields every webinar registration matching the filters, one page at a
+        time. See `iter_pages`.
+        """
+        return self.iter_pages(
+            self.webinar_registrations, 'webinar_registrations', per_page=per_page, prefetch=prefetch, **params
+        )
+
+    @_instrumented
     def webinar_registration(self, pk, **params):
         return self._do_json('webinar_registrations/%s' % pk, params=self._params(**params))
 
+    @_instrumented
     def webinar_registrations_by_user(self, user_id, **params):
         return self._do_json('users/%s/webinar_registrations' % user_id, params=self._params(**params))
 
+    @_instrumented
     def create_webinar_registration(self, user_id, webinar_id, **data):
         data['user_id'] = user_id
         data['product_id'] = webinar_id
         return self._do_request('webinar_registrations', method='post', json={'webinar_registration': data})
 
+    def iter_pages(self, method, key, per_page=100, prefetch=False, **params):
+        """
+        Pages through one of the list endpoints, e.g.
+        `store.iter_pages(store.orders, 'orders', **{'q[state_eq]': 'complete'})`,
+        yielding the records under `key` in each page. Pages are only requested
+        as they're needed, so at most one page (two with `prefetch`) is held in
+        memory at a time.
+
+        With `prefetch=True`, the next page is requested in a background
+        thread while the current one is being processed.
+
+        Listings without a `pages` count are followed until a page comes back
+        with fewer than `per_page` records. Raises `PageError` if a page can't
+        be read, rather than ending the listing early.
+        """
+        def fetch(page):
+            data = method(page=page, per_page=per_page, **params)
+            if not isinstance(data, dict) or key not in data:
+                raise PageError('Could not read page %d of %s from the store' % (page, key))
+            return data
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 1
+            data = fetch(page)
+            while True:
+                records = data[key] or []
+                if 'pages' in data:
+                    last_page = not records or page >= data['pages']
+                else:
+                    # Without a page count, only a full page means there may
+                    # be more. A longer one means `per_page` was ignored.
+                    last_page = len(records) != per_page
+                next_data = None
+                if executor is not None and not last_page:
+                    next_data = executor.submit(fetch, page + 1)
+
+                yield from records
+
+                if last_page:
+                    return
+                page += 1
+                data = next_data.result() if next_data is not None else fetch(page)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
     #########
     # End API
     #########
 
+    def invalidate(self, endpoint, pk=None, **params):
+        """
+        Removes a cached response, given the endpoint name and the same
+        arguments it was called with:
+
+            ```
+            store.invalidate('product', 12)
+            store.invalidate('products', per_page=100)
+            ```
+        """
+        if self.cache is not None:
+            path, params = self.__cacheable_request(endpoint, pk, self._params(**params))
+            self.cache.invalidate(path, params)
+
+    def invalidate_all(self):
+        """
+        Removes every cached response.
+        """
+        if self.cache is not None:
+            self.cache.clear()
+
     def _build_url(self, path):
         return '%s%s' % (self._endpoint, path)
 
     def _do_request(self, path, method='get', **kwargs):
         kwargs.setdefault('headers', self._headers)
-        kwargs.setdefault('timeout', 10)
+        kwargs.setdefault('timeout', self._timeout)
         kwargs.setdefault('verify', getattr(settings, 'PYETI_STORE_VERIFY_SSL', not settings.DEBUG))
-        return requests.request(method, self._build_url(path), **kwargs)
+        url = self._build_url(path)
+
+        endpoint = getattr(self._local, 'endpoint', None) or path
+        attempts = [0]
+        response = error = None
+        started = time.monotonic()
+        try:
+            response = self.__send(method, url, kwargs, attempts)
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.__record(endpoint, method, time.monotonic() - started, response, attempts[0], error)
+
+    def __send(self, method, url, kwargs, attempts):
+        if not self.circuit_breaker.allow_request():
+            raise StoreUnavailable('The store is unavailable, not calling %s' % url)
+
+        # Record an outcome however the call ends, so that a failed trial
+        # request can't leave the circuit half-open.
+        try:
+            response = self.__send_with_retries(method, url, kwargs, attempts)
+        except BaseException:
+            self.circuit_breaker.record_failure()
+            raise
+        if response.status_code in RETRY_STATUS_CODES:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def __send_with_retries(self, method, url, kwargs, attempts):
+        idempotent = method.lower() == 'get'
+        for attempt in range(self._retries + 1):
+            retrying = attempt < self._retries
+            attempts[0] = attempt + 1
+            self.rate_limiter.acquire()
+            try:
+                with self._concurrency:
+                    response = self._session.request(method, url, **kwargs)
+            except requests.ConnectionError as e:
+                # Includes `ConnectTimeout`, but not `ReadTimeout`: a store
+                # that's slow to answer isn't asked again.
+                if not (idempotent and retrying):
+                    raise
+                logger.info('Retrying %s %s after a %s', method.upper(), url, type(e).__name__)
+            else:
+                if response.status_code == TOO_MANY_REQUESTS_STATUS_CODE:
+                    # The store is up, it just wants us to slow down. Nothing
+                    # was done, so any method can be retried.
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if not retrying or (retry_after or 0) > MAX_RETRY_AFTER:
+                        return response
+                    logger.info('Retrying %s %s after a 429 response', method.upper(), url)
+                    if retry_after is not None:
+                        self.rate_limiter.pause(retry_after)
+                        continue
+                elif response.status_code not in RETRY_STATUS_CODES or not (idempotent and retrying):
+                    return response
+                else:
+                    logger.info('Retrying %s %s after a %d response', method.upper(), url, response.status_code)
+            time.sleep(random.uniform(0, self._backoff * 2 ** attempt))  # noqa: S311
+
+    def __record(self, endpoint, method, duration, response, attempts, error):
+        status_code = response.status_code if response is not None else None
+        size = len(response.content or b'') if response is not None else 0
+        retries = max(attempts - 1, 0)
+        self.metrics.record(endpoint, duration, status_code=status_code, size=size, retries=retries, error=error)
+        signals.store_request_finished.send(
+            sender=self.__class__, endpoint=endpoint, method=method.lower(), duration=duration,
+            status_code=status_code, size=size, retries=retries, error=error,
+        )
 
     def _do_json(self, *args, **kwargs):
-        response = self._do_request(*args, **kwargs)
+        return self._decode_json(self._do_request(*args, **kwargs))
 
+    def _decode_json(self, response):
         try:
-            return response.json()
-        except Exception as e:
-            logger.error("""
+            return decode_json(response)
+        except ValueError:
+            logger.exception("""
                 error calling api:
                 URL: %s
                 result: %s
                 result status %s
-                could not decode result json: %s
-            """, response.url, response.text, response.status_code, e.message)
+                could not decode result json
+            """, response.url, response.text, response.status_code)
+
+    def _do_cached_json(self, endpoint, pk=None, params=None):
+        path, params = self.__cacheable_request(endpoint, pk, params)
+        if self.cache is None or not self.cache.caches_endpoint(endpoint):
+            return self._do_json(path, params=params)
+        return self.cache.get_or_fetch(
+            endpoint, path, params, lambda headers: self.__do_conditional_json(path, params, headers),
+        )
+
+    def __do_conditional_json(self, path, params, conditional_headers):
+        response = self._do_request(path, params=params, headers=dict(self._headers, **conditional_headers))
+        if response.status_code == 304:
+            return NOT_MODIFIED
+        return CachedResponse(
+            self._decode_json(response),
+            status_code=response.status_code,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+        )
+
+    def __cacheable_request(self, endpoint, pk, params):
+        path = self.CACHEABLE_PATHS[endpoint]
+        if pk is not None:
+            path %= pk
+        return path, params or {}
 
     def _params(self, **params):
         if self._group:
@@ -176,5 +542,19 @@ class Store(object):
 store = Store(
     getattr(settings, 'PYETI_STORE_URL', None),
     getattr(settings, 'PYETI_STORE_AUTH_TOKEN', None),
-    group=getattr(settings, 'PYETI_STORE_PRODUCT_GROUP', None)
+    group=getattr(settings, 'PYETI_STORE_PRODUCT_GROUP', None),
+    connect_timeout=getattr(settings, 'PYETI_STORE_CONNECT_TIMEOUT', 3.05),
+    read_timeout=getattr(settings, 'PYETI_STORE_READ_TIMEOUT', 10),
+    retries=getattr(settings, 'PYETI_STORE_RETRIES', 2),
+    backoff=getattr(settings, 'PYETI_STORE_RETRY_BACKOFF', 0.25),
+    circuit_breaker_threshold=getattr(settings, 'PYETI_STORE_CIRCUIT_BREAKER_THRESHOLD', 5),
+    circuit_breaker_cooldown=getattr(settings, 'PYETI_STORE_CIRCUIT_BREAKER_COOLDOWN', 30),
+    rate_limit=getattr(settings, 'PYETI_STORE_RATE_LIMIT', None),
+    rate_limit_burst=getattr(settings, 'PYETI_STORE_RATE_LIMIT_BURST', None),
+    max_concurrency=getattr(settings, 'PYETI_STORE_MAX_CONCURRENCY', None),
+    cache=ResponseCache(
+        settings.PYETI_STORE_CACHE_TTLS,
+        cache_alias=getattr(settings, 'PYETI_STORE_CACHE_ALIAS', 'default'),
+        revalidate_for=getattr(settings, 'PYETI_STORE_CACHE_REVALIDATE_FOR', 86400),
+    ) if getattr(settings, 'PYETI_STORE_CACHE_TTLS', None) else None,
 )
@@ -1,2 +1,20 @@
+import requests
+
+
 class SubscriptionDoesNotExist(RuntimeError):
     pass
+
+
+class StoreUnavailable(requests.ConnectionError):
+    """
+    Raised instead of calling the store while its circuit breaker is open.
+    Subclasses `requests.ConnectionError`, so code that already handles
+    connection problems handles this too.
+    """
+
+
+class PageError(requests.RequestException):
+    """
+    Raised by `Store.iter_pages` when a page couldn't be decoded or came back
+    without its records, e.g. because the store answered with an error.
+    """
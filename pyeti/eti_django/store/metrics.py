@@ -0,0 +1,100 @@
+import bisect
+import threading
+
+# Upper bounds of the latency buckets, in seconds.
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram(object):
+    """
+    Counts observations into fixed buckets, Prometheus-style. Not thread-safe
+    on its own; `StoreMetrics` locks around it.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Returns `(upper bound, count)` pairs, where each count includes every
+        smaller bucket. The last bound is infinity.
+        """
+        pairs = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class EndpointMetrics(object):
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.duration = Histogram(buckets)
+        self.statuses = {}
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+
+    def as_dict(self):
+        return {
+            'count': self.duration.count,
+            'duration_sum': self.duration.sum,
+            'duration_buckets': self.duration.cumulative(),
+            'statuses': dict(self.statuses),
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes': self.bytes,
+        }
+
+
+class StoreMetrics(object):
+    """
+    In-process latency histograms and counters for store calls, per endpoint.
+    Scrape them with `snapshot`:
+
+        ```
+        from pyeti.eti_django.store.client import store
+
+        store.metrics.snapshot()['subscription']['duration_buckets']
+        ```
+
+    A call is counted as an error if it raised or got a 5xx response.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.__buckets = buckets
+        self.__lock = threading.Lock()
+        self.__endpoints = {}
+
+    def record(self, endpoint, duration, status_code=None, size=0, retries=0, error=None):
+        with self.__lock:
+            metrics = self.__endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self.__endpoints[endpoint] = EndpointMetrics(self.__buckets)
+            metrics.duration.observe(duration)
+            if status_code is not None:
+                metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+            if error is not None or (status_code or 0) >= 500:
+                metrics.errors += 1
+            metrics.retries += retries
+            metrics.bytes += size
+
+    def snapshot(self):
+        """
+        Returns a dict of endpoint names to their metrics, as plain data.
+        """
+        with self.__lock:
+            return {endpoint: metrics.as_dict() for endpoint, metrics in self.__endpoints.items()}
+
+    def reset(self):
+        with self.__lock:
+            self.__endpoints = {}
@@ -3,14 +3,18 @@ try:
 except ImportError:  # pragma: no cover
     MiddlewareMixin = object
 
+import logging
 import re
 
+import requests
 from django.conf import settings
 from django.shortcuts import redirect
 from django.utils.functional import cached_property
 
 from . import signals
 
+logger = logging.getLogger(__name__)
+
 
 class SubscriptionMiddleware(MiddlewareMixin):
     """
@@ -54,7 +58,12 @@ class SubscriptionMiddleware(MiddlewareMixin):
             signals.no_license_redirect.send(sender=self.__class__, request=request)
             return redirect(self.no_license_url)
         if ulicense.is_expired or ulicense.needs_sync:
-            ulicense.sync_from_store().save()
+            try:
+                ulicense.sync_from_store().save()
+            except requests.RequestException:
+                # Carry on with what we already know about the license rather
+                # than failing the request.
+                logger.warning('Could not sync usage license %s from the store', ulicense.pk, exc_info=True)
         if ulicense.is_expired:
             signals.expired_license_redirect.send(sender=self.__class__, request=request)
             return redirect(self.expired_license_url)
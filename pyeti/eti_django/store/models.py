@@ -1,3 +1,4 @@
+import logging
 from datetime import timedelta
 
 from django.conf import settings
@@ -12,7 +13,13 @@ except ImportError:
 
 from .client import NO_SUBSCRIPTION_STATUS_CODE, store as main_store
 from .exceptions import SubscriptionDoesNotExist
-from .utils import get_sync_cutoff, parse_spree_date
+from .results import SUBSCRIPTION_NOT_FOUND, Subscription
+from .utils import get_sync_cutoff
+
+logger = logging.getLogger(__name__)
+
+# The fields set when syncing a usage license from the store.
+_SYNCED_FIELDS = ['num_seats', 'start_date', 'end_date', 'spree_order_number', 'last_synced_at', 'extra']
 
 
 class UsageLicenseQuerySet(models.QuerySet):
@@ -26,6 +33,49 @@ class UsageLicenseQuerySet(models.QuerySet):
     def needing_sync(self):
         return self.filter(last_synced_at__lte=get_sync_cutoff())
 
+    def sync_from_store(self, store=None, max_workers=8):
+        """
+        Syncs every license in the queryset from the store with one batch
+        lookup (see `Store.get_subscriptions`) and saves them with one
+        `bulk_update`. Returns the licenses whose subscriptions the store
+        couldn't find; those aren't changed.
+
+        If some lookups fail, the licenses that were looked up are still
+        saved, and then the first failure is raised.
+        """
+        if store is None:
+            store = main_store
+
+        licenses = list(self)
+        missing = []
+        errors = []
+        if getattr(settings, 'PYETI_STORE_DISABLE_LICENSE_CHECK', settings.DEBUG):
+            synced = [usage_license._sync_dummy_license() for usage_license in licenses]
+        else:
+            subscriptions = store.get_subscriptions(
+                [usage_license.token for usage_license in licenses],
+                extra_fields=getattr(settings, 'PYETI_STORE_USAGE_LICENSE_EXTRA_FIELDS', []),
+                max_workers=max_workers,
+                return_exceptions=True,
+            )
+            synced = []
+            for usage_license in licenses:
+                subscription = subscriptions[usage_license.token]
+                if isinstance(subscription, Exception):
+                    logger.warning(
+                        'Could not sync usage license %s: %s', usage_license.pk, type(subscription).__name__,
+                    )
+                    errors.append(subscription)
+                elif subscription is SUBSCRIPTION_NOT_FOUND:
+                    missing.append(usage_license)
+                else:
+                    synced.append(usage_license.apply_subscription(subscription))
+
+        self.model._default_manager.bulk_update(synced, _SYNCED_FIELDS)
+        if errors:
+            raise errors[0]
+        return missing
+
 
 class UsageLicense(models.Model):
     """
@@ -101,16 +151,24 @@ class UsageLicense(models.Model):
                 'Could not find subscription with token %s' % self.token
             )
 
-        subscription = response.json()
-        self.num_seats = subscription['num_seats']
-        self.start_date = parse_spree_date(subscription['start'])
-        self.end_date = parse_spree_date(subscription['end'])
-        self.spree_order_number = subscription['order_number']
-        self.last_synced_at = timezone.now()
-
-        extra_fields = getattr(settings, 'PYETI_STORE_USAGE_LICENSE_EXTRA_FIELDS', [])
-        self.extra = {field: subscription.get(field) for field in extra_fields}
+        subscription = Subscription.from_response(
+            response,
+            registration_code=self.token,
+            extra_fields=getattr(settings, 'PYETI_STORE_USAGE_LICENSE_EXTRA_FIELDS', []),
+        )
+        return self.apply_subscription(subscription)
 
+    def apply_subscription(self, subscription):
+        """
+        Copies a `pyeti.eti_django.store.results.Subscription` onto this
+        object and marks it as synced. Doesn't call `save`.
+        """
+        self.num_seats = subscription.num_seats
+        self.start_date = subscription.start
+        self.end_date = subscription.end
+        self.spree_order_number = subscription.order_number
+        self.last_synced_at = timezone.now()
+        self.extra = subscription.extra
         return self
 
     def _sync_dummy_license(self):
@@ -0,0 +1,77 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from django.utils import timezone
+
+
+class TokenBucket(object):
+    """
+    Limits calls to `rate` per second, allowing bursts of up to `burst` calls
+    (default: `rate`). `acquire` blocks until a call is allowed. `pause` holds
+    every caller back for a while, e.g. when the other side answers `429 Too
+    Many Requests`. With a `rate` of `None`, only pauses apply.
+
+    Safe to share between threads.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.burst = burst or (max(rate, 1) if rate else None)
+        self.__lock = threading.Lock()
+        self.__tokens = self.burst
+        self.__updated_at = self._now()
+        self.__paused_until = 0
+
+    def acquire(self):
+        while True:
+            with self.__lock:
+                wait = self.__wait()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+    def pause(self, seconds):
+        with self.__lock:
+            self.__paused_until = max(self.__paused_until, self._now() + seconds)
+
+    def _now(self):
+        return time.monotonic()
+
+    def _sleep(self, seconds):
+        time.sleep(seconds)
+
+    def __wait(self):
+        """
+        Takes a token and returns 0, or returns how long to wait for one.
+        """
+        now = self._now()
+        if now < self.__paused_until:
+            return self.__paused_until - now
+        if self.rate is None:
+            return 0
+
+        self.__tokens = min(self.burst, self.__tokens + (now - self.__updated_at) * self.rate)
+        self.__updated_at = now
+        if self.__tokens >= 1:
+            self.__tokens -= 1
+            return 0
+        return (1 - self.__tokens) / self.rate
+
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds a `Retry-After` header asks for, or `None`
+    if it can't be parsed. The header is either a number of seconds or an HTTP
+    date.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - timezone.now()).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,69 @@
+from .client import LAPSED_SUBSCRIPTION_STATUS_CODE, decode_json
+from .utils import parse_spree_date
+
+
+class _NotFound(object):
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'SUBSCRIPTION_NOT_FOUND'
+
+
+# Stands in for the subscriptions that `Store.get_subscriptions` couldn't find.
+SUBSCRIPTION_NOT_FOUND = _NotFound()
+
+
+class Subscription(object):
+    """
+    The parts of a store subscription that usage licenses use, parsed and
+    typed. Slotted, so that syncing many licenses doesn't keep a dict of the
+    whole payload around for each one.
+    """
+
+    __slots__ = ('registration_code', 'num_seats', 'start', 'end', 'order_number', 'status_code', 'extra')
+
+    def __init__(self, registration_code, num_seats, start, end, order_number, status_code, extra=None):
+        self.registration_code = registration_code
+        self.num_seats = num_seats
+        self.start = start
+        self.end = end
+        self.order_number = order_number
+        self.status_code = status_code
+        self.extra = extra if extra is not None else {}
+
+    @classmethod
+    def from_payload(cls, payload, status_code, registration_code=None, extra_fields=()):
+        """
+        Builds a subscription from decoded JSON, keeping only `extra_fields`
+        out of the other keys.
+        """
+        return cls(
+            payload.get('registration_code', registration_code),
+            payload['num_seats'],
+            parse_spree_date(payload['start']),
+            parse_spree_date(payload['end']),
+            payload['order_number'],
+            status_code,
+            {field: payload.get(field) for field in extra_fields},
+        )
+
+    @classmethod
+    def from_response(cls, response, registration_code=None, extra_fields=()):
+        """
+        Builds a subscription from a store response. Raises
+        `requests.HTTPError` for error responses.
+        """
+        response.raise_for_status()
+        return cls.from_payload(
+            decode_json(response), response.status_code,
+            registration_code=registration_code, extra_fields=extra_fields,
+        )
+
+    @property
+    def is_lapsed(self):
+        return self.status_code == LAPSED_SUBSCRIPTION_STATUS_CODE
+
+    def __repr__(self):
+        return '<Subscription %s: %s seats until %s>' % (self.registration_code, self.num_seats, self.end)
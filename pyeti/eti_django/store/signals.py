@@ -2,3 +2,4 @@ from django.dispatch import Signal
 
 no_license_redirect = Signal()
 expired_license_redirect = Signal()
+store_request_finished = Signal()
@@ -0,0 +1,229 @@
+"""
+A stand-in for the store's API, for tests, benchmarks and load tests that
+shouldn't need a real Spree instance:
+
+    ```
+    from pyeti.eti_django.store.client import Store
+    from pyeti.eti_django.store.testing import SpreeStubServer
+
+    with SpreeStubServer(latency=0.01, error_rate=0.05) as server:
+        server.add_subscription('abc123', num_seats=30)
+        server.add_subscription('lapsed', lapsed=True)
+        store = Store(server.url, 'token')
+        store.subscription(None, 'abc123').json()['num_seats']  # 30
+    ```
+"""
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .client import (
+    LAPSED_SUBSCRIPTION_STATUS_CODE, NO_SUBSCRIPTION_STATUS_CODE,
+    SUBSCRIPTION_OK_STATUS_CODE,
+)
+
+_API_PREFIX = '/api/v1/'
+
+
+def spree_datetime(value):
+    """
+    Formats a datetime the way Spree does, e.g. `2018-09-01T14:30:00.000Z`.
+    """
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + '%03dZ' % (value.microsecond // 1000)
+
+
+class SpreeStubServer(object):
+    """
+    Serves a small, in-memory copy of the store's API over HTTP on a local
+    port, in a background thread. It answers `account_subscriptions`,
+    `users`, `orders`, `products` and `webinars` requests, paginating lists
+    with `page` and `per_page` like Spree.
+
+    `latency` is the number of seconds each response is delayed by, or a
+    `(minimum, maximum)` pair to pick from at random. `error_rate` is the
+    share of requests (0 to 1) that get a `503` instead of an answer.
+    Subscriptions added with `lapsed=True` get a `211` response, and unknown
+    registration codes a `212`, like the real store.
+
+    `users`, `orders`, `products` and `webinars` records are generated for
+    list and detail requests; pass counts to change how many.
+    """
+
+    def __init__(self, latency=0, error_rate=0, users=50, orders=200, products=20, webinars=10, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self.subscriptions = {}
+        self.records = {
+            'users': [{'id': pk, 'email': 'user%d@example.com' % pk} for pk in range(1, users + 1)],
+            'orders': [
+                {'id': pk, 'number': 'R%09d' % pk, 'state': 'complete', 'user_id': pk % max(users, 1) + 1}
+                for pk in range(1, orders + 1)
+            ],
+            'products': [
+                {'id': pk, 'name': 'Product %d' % pk, 'price': '%d.00' % (pk * 10)} for pk in range(1, products + 1)
+            ],
+            'webinars': [{'id': pk, 'name': 'Webinar %d' % pk} for pk in range(1, webinars + 1)],
+        }
+        self.__random = random.Random(seed)  # noqa: S311
+        self.__lock = threading.Lock()
+        self.__server = None
+        self.__thread = None
+
+    @property
+    def url(self):
+        """
+        The URL to give `Store`, which adds the `api/v1/` part itself.
+        """
+        host, port = self.__server.server_address[:2]
+        return 'http://%s:%d/' % (host, port)
+
+    def add_subscription(self, registration_code, num_seats=10, start=None, end=None, lapsed=False, **extra):
+        now = datetime.now(timezone.utc)
+        if start is None:
+            start = now - timedelta(days=30)
+        if end is None:
+            end = now - timedelta(days=1) if lapsed else now + timedelta(days=365)
+        subscription = dict(
+            {
+                'registration_code': registration_code,
+                'num_seats': num_seats,
+                'start': spree_datetime(start),
+                'end': spree_datetime(end),
+                'order_number': 'R%09d' % (len(self.subscriptions) + 1),
+            },
+            **extra
+        )
+        self.subscriptions[registration_code] = (subscription, lapsed)
+        return subscription
+
+    def start(self):
+        self.__server = _Server(('127.0.0.1', 0), _handler_for(self))
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, method, path, query):
+        """
+        Returns the `(status code, body)` for a request. Called by the request
+        handler; override it to add endpoints.
+        """
+        with self.__lock:
+            self.requests_served += 1
+            delay = self.__random.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+            failing = self.__random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if failing:
+            return 503, {'error': 'Service Unavailable'}
+
+        parts = path.strip('/').split('/')
+        if method == 'GET' and parts[0] == 'account_subscriptions':
+            return self.__subscription(query)
+        if method == 'GET' and parts[0] == 'webinars':
+            return self.__list_or_detail('webinars', [] if parts[1:] == ['all'] else parts[1:], query)
+        if method == 'GET' and parts[0] in ('users', 'orders', 'products'):
+            if len(parts) == 3 and parts[0] == 'users' and parts[2] == 'orders':
+                return self.__list(
+                    'orders', query, [order for order in self.records['orders'] if str(order['user_id']) == parts[1]],
+                )
+            return self.__list_or_detail(parts[0], parts[1:], query)
+        return 404, {'error': 'Not found'}
+
+    def __subscription(self, query):
+        code = query.get('registration_code')
+        if code not in self.subscriptions:
+            return NO_SUBSCRIPTION_STATUS_CODE, {'error': 'No subscription found'}
+        subscription, lapsed = self.subscriptions[code]
+        return LAPSED_SUBSCRIPTION_STATUS_CODE if lapsed else SUBSCRIPTION_OK_STATUS_CODE, subscription
+
+    def __list_or_detail(self, key, parts, query):
+        if not parts:
+            return self.__list(key, query, self.records[key])
+        for record in self.records[key]:
+            if str(record['id']) == parts[0]:
+                return 200, record
+        return 404, {'error': 'Not found'}
+
+    def __list(self, key, query, records):
+        try:
+            page = max(int(query.get('page', 1)), 1)
+            per_page = max(int(query.get('per_page', 25)), 1)
+        except ValueError:
+            return 422, {'error': 'Invalid page'}
+        page_records = records[(page - 1) * per_page:page * per_page]
+        return 200, {
+            key: page_records,
+            'count': len(page_records),
+            'total_count': len(records),
+            'current_page': page,
+            'per_page': per_page,
+            'pages': max(math.ceil(len(records) / per_page), 1),
+        }
+
+
+class _Server(ThreadingHTTPServer):
+
+    daemon_threads = True
+    # Load tests open many connections at once; the default backlog of 5
+    # makes the rest wait for SYN retries.
+    request_queue_size = 128
+
+
+def _handler_for(server):
+
+    class _Handler(BaseHTTPRequestHandler):
+
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately, which otherwise stalls
+        # keep-alive connections on delayed ACKs.
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.__respond('GET')
+
+        def do_POST(self):
+            self.__respond('POST')
+
+        def do_PUT(self):
+            self.__respond('PUT')
+
+        def log_message(self, *args):
+            pass
+
+        def __respond(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+
+            url = urlsplit(self.path)
+            if not url.path.startswith(_API_PREFIX):
+                status, body = 404, {'error': 'Not found'}
+            else:
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                status, body = server.respond(method, url.path[len(_API_PREFIX):], query)
+
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return _Handler
@@ -1,11 +1,28 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from dateutil import parser
 from django.conf import settings
 from django.utils import timezone
 
-parse_spree_date = parser.parse
-parse_spree_datetime = parser.parse
+
+def parse_spree_datetime(string):
+    """
+    Parses a date or datetime string from the store, e.g.
+    `2018-09-01T14:30:00.000Z`. ISO 8601 strings, which is everything Spree
+    sends, are parsed with `datetime.fromisoformat`. Anything else falls back
+    to `dateutil.parser.parse`, which is much slower but more lenient.
+    """
+    if isinstance(string, str):
+        # `fromisoformat` only accepts a `Z` suffix from Python 3.11.
+        iso_string = string[:-1] + '+00:00' if string.endswith('Z') else string
+        try:
+            return datetime.fromisoformat(iso_string)
+        except ValueError:
+            pass
+    return parser.parse(string)
+
+
+parse_spree_date = parse_spree_datetime
 
 
 def difference_in_days(string):
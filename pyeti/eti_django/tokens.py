@@ -1,6 +1,16 @@
+import hashlib
+import hmac
+import time
+from datetime import timedelta
+
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils import crypto
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import (
+    base36_to_int, int_to_base36, urlsafe_base64_decode, urlsafe_base64_encode,
+)
 
 
 class TokenGenerator(object):
@@ -37,6 +47,14 @@ class TokenGenerator(object):
         """
         return crypto.constant_time_compare(self.generate(), token)
 
+    def lookup_token(self):
+        """
+        Generates a token that also carries the object's primary key, so the
+        object can be found from the token alone. See
+        `SecureTokenQuerySet.find_by_token`.
+        """
+        return '%s-%s' % (urlsafe_base64_encode(force_bytes(self.__object.pk)), self.generate())
+
     def __call__(self):
         return self.generate()
 
@@ -46,6 +64,188 @@ class TokenGenerator(object):
         return '%s.%s' % (cls.__module__, cls.__name__)
 
 
+class BulkTokenGenerator(object):
+    """
+    Generates and validates `TokenGenerator` tokens for many objects of the
+    same model class at once. `TokenGenerator` derives the HMAC key from
+    `SECRET_KEY` for every token. This class derives it once, up front, and
+    reuses the keyed HMAC state for each object. The tokens are identical.
+
+        ```
+        generator = MyModel.token_generator()
+        tokens = generator.generate(MyModel.objects.all())
+        results = generator.validate(zip(records, presented_tokens))
+        ```
+    """
+
+    def __init__(self, model, hash_attribute):
+        key_salt = '%s.%s' % (model.__module__, model.__name__)
+        self.__hmac = _keyed_hmac(key_salt, settings.SECRET_KEY)
+        self.__attribute = hash_attribute
+
+    def generate(self, objects):
+        """
+        Returns a list of tokens, one for each of the given objects.
+        """
+        return [self.generate_one(obj) for obj in objects]
+
+    def generate_one(self, obj):
+        mac = self.__hmac.copy()
+        mac.update(force_bytes(getattr(obj, self.__attribute)))
+        return mac.hexdigest()[::2]
+
+    def validate(self, pairs):
+        """
+        Given an iterable of `(object, token)` pairs, returns a list of
+        booleans indicating whether each token is valid for its object. Tokens
+        are compared in constant time.
+        """
+        return [self.validate_one(obj, token) for obj, token in pairs]
+
+    def validate_one(self, obj, token):
+        return crypto.constant_time_compare(self.generate_one(obj), token)
+
+
+def _keyed_hmac(key_salt, secret):
+    """
+    Returns an HMAC object keyed the same way as `crypto.salted_hmac`, ready to
+    be copied and fed a value.
+    """
+    key = hashlib.sha1(force_bytes(key_salt) + force_bytes(secret)).digest()  # noqa: S324
+    return hmac.new(key, digestmod=hashlib.sha1)
+
+
+# Timestamps are seconds since 2001-01-01, like Django's password reset tokens,
+# to keep them short.
+_TIMESTAMP_EPOCH = 978307200
+_MAX_TIMESTAMP_LENGTH = 8
+_SIGNATURE_LENGTH = 20
+_HEX_DIGITS = frozenset('0123456789abcdef')
+_BASE36_DIGITS = frozenset('0123456789abcdefghijklmnopqrstuvwxyz')
+
+
+class ExpiringTokenGenerator(object):
+    """
+    Signed tokens that expire after `max_age` (seconds or a `timedelta`),
+    without storing anything. The token embeds its creation time:
+
+        ```
+        generator = ExpiringTokenGenerator('myapp.email-confirmation', timedelta(days=3))
+        token = generator.generate(user.token_hash)
+        generator.validate(user.token_hash, token)  # True, for three days
+        ```
+
+    Validation needs no database access beyond having the signed value.
+    Malformed and expired tokens are rejected before any HMAC is computed.
+
+    Tokens are signed with the first of `secrets`, and validated against all
+    of them, so secrets can be rotated. `secrets` defaults to
+    `settings.SECRET_KEY` followed by `settings.SECRET_KEY_FALLBACKS`. Use a
+    different `key_salt` for each purpose.
+    """
+
+    def __init__(self, key_salt, max_age, secrets=None):
+        if isinstance(max_age, timedelta):
+            max_age = max_age.total_seconds()
+        if secrets is None:
+            secrets = [settings.SECRET_KEY] + list(getattr(settings, 'SECRET_KEY_FALLBACKS', []))
+
+        self.__max_age = max_age
+        self.__hmacs = [_keyed_hmac(key_salt, secret) for secret in secrets]
+
+    def generate(self, value):
+        """
+        Generates a new token for the given value, valid from now.
+        """
+        timestamp = int_to_base36(self._now())
+        return '%s-%s' % (timestamp, self.__sign(self.__hmacs[0], value, timestamp))
+
+    def validate(self, value, token):
+        """
+        Returns `True` if the token was generated for the given value with one
+        of the secrets and hasn't expired.
+        """
+        if not isinstance(token, str) or len(token) > _MAX_TIMESTAMP_LENGTH + 1 + _SIGNATURE_LENGTH:
+            return False
+        timestamp, _, signature = token.partition('-')
+        if not timestamp or len(signature) != _SIGNATURE_LENGTH or \
+                not _BASE36_DIGITS.issuperset(timestamp) or not _HEX_DIGITS.issuperset(signature):
+            return False
+
+        age = self._now() - base36_to_int(timestamp)
+        if age < 0 or age > self.__max_age:
+            return False
+
+        valid = False
+        for mac in self.__hmacs:
+            valid |= crypto.constant_time_compare(self.__sign(mac, value, timestamp), signature)
+        return valid
+
+    def _now(self):
+        return int(time.time()) - _TIMESTAMP_EPOCH
+
+    def __sign(self, mac, value, timestamp):
+        mac = mac.copy()
+        mac.update(force_bytes('%s:%s' % (value, timestamp)))
+        return mac.hexdigest()[::2]
+
+
+def parse_lookup_token(token):
+    """
+    Splits a token made by `TokenGenerator.lookup_token` into the primary key
+    (as a string) and the signed token. Returns `None` if it is malformed.
+    """
+    uid, _, signed = str(token).rpartition('-')
+    if not uid or not signed:
+        return None
+    try:
+        pk = force_str(urlsafe_base64_decode(uid))
+    except (TypeError, ValueError):
+        return None
+    return (pk, signed) if pk else None
+
+
+def _find_by_token(queryset, token):
+    parsed = parse_lookup_token(token)
+    if parsed is None:
+        return None
+    pk, signed = parsed
+
+    try:
+        record = queryset.filter(pk=pk).first()
+    except (ValueError, ValidationError):
+        return None
+
+    if record is None or not record.token.validate(signed):
+        return None
+    return record
+
+
+class SecureTokenQuerySet(models.QuerySet):
+    """
+    Opt-in queryset for models with `HasSecureTokenMixin`, to look records up
+    by token from a manager or a filtered queryset:
+
+        ```
+        class MyModel(HasSecureTokenMixin, models.Model):
+
+            objects = SecureTokenQuerySet.as_manager()
+
+
+        MyModel.objects.filter(active=True).find_by_token(token)
+        ```
+    """
+
+    def find_by_token(self, token):
+        """
+        Returns the record a lookup token was generated for, or `None` if the
+        token is malformed, the record does not exist or the token does not
+        validate. Uses a single primary key query, and the token is compared
+        in constant time.
+        """
+        return _find_by_token(self, token)
+
+
 class HasSecureTokenMixin(models.Model):
     """
     Small mixin for models that should have a token attached to them. Usage:
@@ -62,14 +262,37 @@ class HasSecureTokenMixin(models.Model):
         record = MyModel.objects.first()
         token = record.token.generate()  # or record.token()
         record.token.validate(other_token)
+
+        # For many records at once:
+        MyModel.token_generator().generate(MyModel.objects.all())
+
+        # Tokens that carry the primary key can be looked up directly:
+        token = record.token.lookup_token()
+        MyModel.find_by_token(token)  # record
+        ```
+
+    The mixin doesn't add a manager. To look tokens up on a filtered
+    queryset, use `SecureTokenQuerySet` for your manager.
     """
 
     token_hash = models.CharField(max_length=16)
 
+    @classmethod
+    def find_by_token(cls, token):
+        """
+        Like `SecureTokenQuerySet.find_by_token`, using the model's default
+        manager.
+        """
+        return _find_by_token(cls._default_manager, token)
+
     @property
     def token(self):
         return TokenGenerator(self, 'token_hash')
 
+    @classmethod
+    def token_generator(cls):
+        return BulkTokenGenerator(cls, 'token_hash')
+
     def save(self, *args, **kwargs):
         if not self.token_hash:
             self.token_hash = crypto.get_random_string(length=16)
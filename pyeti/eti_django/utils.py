@@ -1,6 +1,7 @@
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from django.utils import dateparse
+from django.utils.functional import Promise
 
 from pyeti.utils import is_truthy
 
@@ -9,38 +10,112 @@ def typecast_from_field(field, value):
     """
     Given a Django model field and a value, typecast the value to the datatype
     expected by the field.
+
+    When casting many values for the same field, use `compile_typecaster` or
+    `typecast_rows` instead so the field is only inspected once.
     """
     if not isinstance(value, str):
         return value
 
+    return compile_typecaster(field)(value)
+
+
+def compile_typecaster(field):
+    """
+    Inspects a Django model field once and returns a function that typecasts a
+    single value the same way `typecast_from_field` would:
+
+        ```
+        cast = compile_typecaster(MyModel._meta.get_field('age'))
+        ages = [cast(value) for value in column]
+        ```
+    """
     options = field.deconstruct()[-1]
 
-    if options.get('null') and value.strip() == '':
-        return None
+    if isinstance(field, ArrayField):
+        cast = _compile_arrayfield(options['base_field'])
+    else:
+        cast = _find_typecaster(field)
 
     if 'choices' in options:
-        for choice, label in options['choices']:
-            if value == label:
-                return choice
+        cast = _with_choices(cast, options['choices'])
 
-    if isinstance(field, ArrayField):
-        return _parse_arrayfield(value, options['base_field'])
+    if options.get('null'):
+        cast = _with_null(cast)
+
+    def typecaster(value):
+        if not isinstance(value, str):
+            return value
+        return cast(value)
+
+    return typecaster
+
+
+def typecast_rows(model, fieldnames, rows):
+    """
+    Typecasts an iterable of rows (sequences of strings, in the same order as
+    `fieldnames`) to the datatypes expected by the model's fields. One
+    typecaster is compiled per column up front. Yields a dict per row mapping
+    field names to values, suitable for `model(**row)`. Raises `ValueError`
+    for a row with more or fewer values than there are field names.
+    """
+    casters = [
+        (name, compile_typecaster(model._meta.get_field(name)))
+        for name in fieldnames
+    ]
 
+    for row in rows:
+        if len(row) != len(casters):
+            raise ValueError('Expected %d values, got %d: %r' % (len(casters), len(row), row))
+        yield {name: cast(value) for (name, cast), value in zip(casters, row)}
+
+
+def _compile_arrayfield(base_field):
+    cast = compile_typecaster(base_field)
+
+    def parse_arrayfield(value):
+        if value.strip() == '':
+            return []
+        return [cast(val) for val in value.split(',')]
+
+    return parse_arrayfield
+
+
+def _find_typecaster(field):
     for field_class, typecaster in _TYPECASTERS.items():
         if isinstance(field, field_class):
-            return typecaster(value)
+            return typecaster
+    return _identity
 
-    return value
 
+def _with_choices(cast, choices):
+    # Earlier choices win when labels are duplicated, as in a linear scan.
+    by_label = {}
+    for choice, label in choices:
+        if isinstance(label, Promise):
+            label = str(label)
+        if isinstance(label, str):
+            by_label.setdefault(label, choice)
 
-def _parse_arrayfield(value, base_field):
-    if value.strip() == '':
-        return []
+    def cast_choice(value):
+        if value in by_label:
+            return by_label[value]
+        return cast(value)
 
-    return [
-        typecast_from_field(base_field, val)
-        for val in value.split(',')
-    ]
+    return cast_choice
+
+
+def _with_null(cast):
+    def cast_nullable(value):
+        if value.strip() == '':
+            return None
+        return cast(value)
+
+    return cast_nullable
+
+
+def _identity(value):
+    return value
 
 
 _TYPECASTERS = {
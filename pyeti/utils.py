@@ -1,5 +1,14 @@
 import datetime
 import re
+import unicodedata
+from collections import Counter
+from decimal import Decimal
+from itertools import islice
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
 
 
 def ignore_exception(*exception_classes):
@@ -24,8 +33,16 @@ def ignore_exception(*exception_classes):
     return decorator
 
 
-_yes_values = ['y', 'yes', '1', 'true']
-_no_values = ['n', 'no', '0', 'false', '']
+_yes_values = frozenset(['y', 'yes', '1', 'true'])
+_no_values = frozenset(['n', 'no', '0', 'false', ''])
+
+# Exact spellings that can be looked up without stripping or lowercasing.
+_truthy_spellings = {
+    spelling: result
+    for values, result in ((_yes_values, True), (_no_values, False))
+    for value in values
+    for spelling in (value, value.upper(), value.capitalize())
+}
 
 
 def is_truthy(value):
@@ -44,6 +61,71 @@ def is_truthy(value):
     return bool(value)
 
 
+class UnrecognizedBooleanError(ValueError):
+    """
+    Raised by `truthy_column` in strict mode. `values` is a list of
+    `(index, value)` pairs for the values that could not be interpreted.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        super().__init__('%d unrecognized boolean value(s), starting with %s' % (
+            len(values), ', '.join('%r' % value for _, value in values[:5]),
+        ))
+
+
+def truthy_column(values, strict=False, as_array=False):
+    """
+    Converts a whole column of values (any iterable, including a NumPy object
+    array) to booleans the same way `is_truthy` does for a single value.
+    Common spellings like "yes", "False" or "1" are looked up directly.
+
+    In strict mode, values that aren't a recognized yes/no string, a boolean,
+    or a number equal to 0 or 1 are not passed to `bool()`. Instead, an
+    `UnrecognizedBooleanError` listing all of them is raised.
+
+    With `as_array=True`, returns a NumPy boolean array instead of a list.
+    """
+    if strict:
+        result = _strict_truthy_column(values)
+    else:
+        table = _truthy_spellings
+        result = [
+            (table[value] if value in table else is_truthy(value)) if isinstance(value, str) else bool(value)
+            for value in values
+        ]
+
+    if as_array:
+        if numpy is None:
+            raise ImportError('NumPy is required for truthy_column(..., as_array=True)')
+        return numpy.array(result, dtype=bool)
+    return result
+
+
+def _strict_truthy_column(values):
+    table = _truthy_spellings
+    result = []
+    unrecognized = []
+
+    for index, value in enumerate(values):
+        if isinstance(value, str):
+            if value in table:
+                result.append(table[value])
+                continue
+            normalized = value.strip().lower()
+            if normalized in _yes_values or normalized in _no_values:
+                result.append(normalized in _yes_values)
+                continue
+        elif value in (0, 1):
+            result.append(bool(value))
+            continue
+        unrecognized.append((index, value))
+
+    if unrecognized:
+        raise UnrecognizedBooleanError(unrecognized)
+    return result
+
+
 _integer_re = re.compile(r'^\-?[\d,]*$')
 _float_re = re.compile(r'^[-+]?[\d,]*\.?\d+([eE][-+]?\d+)?$')
 
@@ -56,7 +138,7 @@ def typecast_guess(value):
         return value
 
     stripped = value.strip()
-    if stripped.lower() in ['', 'none', 'na', 'n/a']:
+    if stripped.lower() in _null_values:
         return None
     if _integer_re.match(value):
         return int(clean_numeric_string(value))
@@ -65,6 +147,80 @@ def typecast_guess(value):
     return stripped
 
 
+_null_values = frozenset(['', 'none', 'na', 'n/a'])
+_numeric_start = frozenset('+-.,0123456789')
+
+
+def typecast_column(values, sample_size=100, as_array=False):
+    """
+    Typecasts a whole column of values, giving the same results as calling
+    `typecast_guess` on each one, but much faster for large columns.
+
+    The column's dominant type (integer, float or string) is inferred from the
+    first `sample_size` values and the column is converted in a single pass
+    with a caster specialized for that type. Values that don't fit it are
+    handed to `typecast_guess`.
+
+    With `as_array=True`, numeric columns are returned as a NumPy array
+    (`int64`, or `float64` with `nan` for nulls). Other columns, or numeric
+    columns with non-numeric outliers, become an `object` array.
+    """
+    values = values if isinstance(values, list) else list(values)
+
+    sampled = Counter(type(typecast_guess(value)) for value in islice(values, sample_size))
+    if sampled[float]:
+        cast = _cast_float
+    elif sampled[int] >= sampled[str]:
+        cast = _cast_int
+    else:
+        cast = _cast_str
+
+    result = [cast(value) for value in values]
+
+    if as_array:
+        return _to_array(result)
+    return result
+
+
+def _cast_int(value):
+    if value.__class__ is str and value.isascii():
+        digits = value[1:] if value[:1] == '-' else value
+        if digits.isdigit():
+            return int(value)
+    return typecast_guess(value)
+
+
+def _cast_float(value):
+    if value.__class__ is str and value.isascii():
+        digits = value[1:] if value[:1] == '-' else value
+        if digits.isdigit():
+            return int(value)
+        whole, _, fraction = digits.partition('.')
+        if fraction.isdigit() and (not whole or whole.isdigit()):
+            return float(value)
+    return typecast_guess(value)
+
+
+def _cast_str(value):
+    if value.__class__ is str and value[:1] not in _numeric_start:
+        stripped = value.strip()
+        if stripped.lower() not in _null_values:
+            return stripped
+    return typecast_guess(value)
+
+
+def _to_array(result):
+    if numpy is None:
+        raise ImportError('NumPy is required for typecast_column(..., as_array=True)')
+
+    types = set(map(type, result))
+    if types <= {int}:
+        return numpy.array(result, dtype=numpy.int64)
+    if types <= {int, float, type(None)}:
+        return numpy.array([numpy.nan if value is None else value for value in result], dtype=numpy.float64)
+    return numpy.array(result, dtype=object)
+
+
 _non_numeric_re = re.compile(r'[^\+\-\d\.eE]')
 
 
@@ -76,6 +232,103 @@ def clean_numeric_string(value):
     return _non_numeric_re.sub('', value)
 
 
+def parse_number(value, decimal_separator='.', group_separator=',', use_decimal=False):
+    """
+    Parses a number as it might be written in a spreadsheet, in a single pass
+    over the string. Understands:
+
+        - locale-specific separators: `parse_number('1.234,56',
+          decimal_separator=',', group_separator='.')` is `1234.56`
+        - currency symbols before or after the number: `'$1,200'`, `'12 €'`
+        - percentages: `'12.5%'` is `0.125`
+        - negatives written with a sign or in parentheses: `'(1,200)'`
+        - exponents: `'1.5e3'`
+
+    Returns an `int` for whole numbers and a `float` otherwise, or a `Decimal`
+    instead of a `float` if `use_decimal` is set. Group separators may only
+    appear before the decimal separator, but group sizes are not enforced, so
+    `'1,00,000'` parses too. Raises `ValueError` if the string is not a number,
+    or if the value is neither a string nor a number. Numbers are returned
+    unchanged; booleans aren't numbers here.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float, Decimal)):
+        raise ValueError('Could not parse %r as a number' % (value,))
+    if not isinstance(value, str):
+        return value
+
+    text = value.strip()
+    if text.isdecimal():
+        return int(text)
+
+    negative = percent = False
+    if not (text[:1].isdecimal() and text[-1:].isdecimal()):
+        if text[:1] == '(' and text[-1:] == ')':
+            negative = True
+            text = text[1:-1].strip()
+
+        percent = text[-1:] == '%'
+        if percent:
+            text = text[:-1].rstrip()
+
+        # Only one sign is allowed, and none inside parentheses.
+        signed = negative
+        if text[:1] in _signs:
+            if signed:
+                raise ValueError('Could not parse %r as a number' % value)
+            negative, signed = text[0] == '-', True
+            text = text[1:]
+        if text and not text[0].isdecimal() and _is_currency(text[0]):
+            text = text[1:].lstrip()
+            if text[:1] in _signs:
+                if signed:
+                    raise ValueError('Could not parse %r as a number' % value)
+                negative = text[0] == '-'
+                text = text[1:]
+        if text and not text[-1].isdecimal() and _is_currency(text[-1]):
+            text = text[:-1].rstrip()
+
+    exponent = ''
+    marker = text.find('e')
+    if marker < 0:
+        marker = text.find('E')
+    if marker >= 0:
+        text, exponent = text[:marker], text[marker + 1:]
+        exponent_digits = exponent[1:] if exponent[:1] in _signs else exponent
+        if not exponent_digits.isdecimal():
+            raise ValueError('Could not parse %r as a number' % value)
+
+    whole, separator, fraction = text.partition(decimal_separator)
+    if group_separator and group_separator in whole:
+        groups = whole.split(group_separator)
+        if not all(groups):
+            raise ValueError('Could not parse %r as a number' % value)
+        whole = ''.join(groups)
+
+    if not (whole or fraction) or (whole and not whole.isdecimal()) or (fraction and not fraction.isdecimal()):
+        raise ValueError('Could not parse %r as a number' % value)
+
+    if not (separator or exponent or percent):
+        number = int(whole)
+        return -number if negative else number
+
+    number = '%s%s.%s' % ('-' if negative else '', whole, fraction)
+    if exponent:
+        number = '%se%s' % (number, exponent)
+    if use_decimal:
+        number = Decimal(number)
+        return number.scaleb(-2) if percent else number
+    number = float(number)
+    return number / 100 if percent else number
+
+
+def _is_currency(character):
+    return character in _currency_symbols or unicodedata.category(character) == 'Sc'
+
+
+_currency_symbols = frozenset('$€£¥')
+_signs = ('-', '+')
+
+
 class AgeMixin(object):
     """
     Calculates the age of a person given a DateField of a person's birthday
@@ -105,3 +358,32 @@ class AgeMixin(object):
         return date.year - birth_date.year - (
             (date.month, date.day) < (birth_date.month, birth_date.day)
         )
+
+
+def ages_on(birth_dates, date):
+    """
+    Vectorized `AgeMixin.age_on`: given a NumPy `datetime64` array of birth
+    dates, returns their ages on the given date as an `int64` array. If any
+    birth dates are missing (`NaT`), a `float64` array with `nan` for those
+    entries is returned instead.
+    """
+    if numpy is None:
+        raise ImportError('NumPy is required for ages_on()')
+
+    birth_dates = numpy.asarray(birth_dates, dtype='datetime64[D]')
+    missing = numpy.isnat(birth_dates)
+    if (birth_dates[~missing] > numpy.datetime64(date, 'D')).any():
+        raise ValueError('Birth date after %s!' % date)
+
+    months = birth_dates.astype('datetime64[M]')
+    years = birth_dates.astype('datetime64[Y]').astype(numpy.int64) + 1970
+    month_numbers = months.astype(numpy.int64) % 12 + 1
+    days = (birth_dates - months).astype(numpy.int64) + 1
+
+    birthday_not_reached = (month_numbers > date.month) | ((month_numbers == date.month) & (days > date.day))
+    ages = date.year - years - birthday_not_reached
+
+    if missing.any():
+        ages = ages.astype(numpy.float64)
+        ages[missing] = numpy.nan
+    return ages
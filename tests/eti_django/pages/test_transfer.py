@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase, override_settings
+
+from pyeti.eti_django.pages.factories import PlaceholderFactory
+from pyeti.eti_django.pages.models import Placeholder
+from pyeti.eti_django.pages.utils import (
+    export_placeholders, guess_placeholder_format, import_placeholders,
+)
+
+
+class ExportPlaceholdersTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__first = PlaceholderFactory(name='First', langcode='en', content='Hello')
+        self.__second = PlaceholderFactory(name='Second', langcode='es', content='Hola')
+
+    def test_exports_json_lines(self):
+        out = io.StringIO()
+        self.assertEqual(2, export_placeholders(out, 'jsonl'))
+        self.assertEqual(
+            [
+                {'name': 'First', 'langcode': 'en', 'content': 'Hello'},
+                {'name': 'Second', 'langcode': 'es', 'content': 'Hola'},
+            ],
+            [json.loads(line) for line in out.getvalue().splitlines()],
+        )
+
+    def test_exports_csv(self):
+        out = io.StringIO()
+        self.assertEqual(2, export_placeholders(out, 'csv'))
+        self.assertEqual(
+            ['name,langcode,content', 'First,en,Hello', 'Second,es,Hola'],
+            out.getvalue().splitlines(),
+        )
+
+    def test_raises_for_unknown_formats(self):
+        with self.assertRaises(ValueError):
+            export_placeholders(io.StringIO(), 'xml')
+
+
+class ImportPlaceholdersTests(TestCase):
+
+    def test_creates_new_placeholders(self):
+        self.assertEqual(2, import_placeholders(io.StringIO(
+            '{"name": "First", "langcode": "en", "content": "Hello"}\n'
+            '\n'
+            '{"name": "Second", "langcode": "es", "content": "Hola"}\n'
+        )))
+        self.assertEqual('Hello', Placeholder.objects.get_by_natural_key('First', 'en').content)
+        self.assertEqual('Hola', Placeholder.objects.get_by_natural_key('Second', 'es').content)
+
+    def test_updates_existing_placeholders_by_natural_key(self):
+        existing = PlaceholderFactory(name='First', langcode='en', content='Old')
+        import_placeholders(io.StringIO('name,langcode,content\nFirst,en,New\n'), 'csv')
+        existing.refresh_from_db()
+        self.assertEqual('New', existing.content)
+        self.assertEqual(1, Placeholder.objects.count())
+
+    def test_keeps_the_last_duplicate_in_a_batch(self):
+        import_placeholders(io.StringIO('name,langcode,content\nFirst,en,One\nFirst,en,Two\n'), 'csv')
+        self.assertEqual('Two', Placeholder.objects.get().content)
+
+    def test_imports_in_batches(self):
+        lines = ''.join(
+            json.dumps({'name': 'Placeholder %d' % i, 'langcode': 'en', 'content': ''}) + '\n'
+            for i in range(5)
+        )
+        with mock.patch.object(Placeholder.objects, 'bulk_create', wraps=Placeholder.objects.bulk_create) as bulk_create:
+            import_placeholders(io.StringIO(lines), batch_size=2)
+        self.assertEqual(3, bulk_create.call_count)
+        self.assertEqual(5, Placeholder.objects.count())
+
+    def test_resets_the_cache_once_without_saving_each_record(self):
+        handler = mock.Mock()
+        post_save.connect(handler, sender=Placeholder)
+        self.addCleanup(post_save.disconnect, handler, sender=Placeholder)
+
+        with mock.patch.object(Placeholder.objects.cache, 'reset') as reset:
+            import_placeholders(io.StringIO('name,langcode,content\nFirst,en,\nSecond,en,\n'), 'csv')
+
+        reset.assert_called_once_with()
+        handler.assert_not_called()
+
+    @override_settings(LANGUAGE_CODE='en')
+    def test_defaults_missing_language_codes(self):
+        import_placeholders(io.StringIO('{"name": "First", "content": "Hello"}\n'))
+        self.assertEqual('en', Placeholder.objects.get().langcode)
+
+    def test_raises_for_records_without_a_name(self):
+        with self.assertRaises(ValueError):
+            import_placeholders(io.StringIO('{"langcode": "en"}\n'))
+
+
+class PlaceholderCommandsTests(TestCase):
+
+    def test_round_trips_through_a_file(self):
+        PlaceholderFactory(name='First', langcode='en', content='Hello, "world"')
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, 'placeholders.csv')
+        call_command('export_placeholders', path, stderr=io.StringIO())
+        Placeholder.objects.all().delete()
+
+        call_command('import_placeholders', path, stdout=io.StringIO())
+        self.assertEqual('Hello, "world"', Placeholder.objects.get_by_natural_key('First', 'en').content)
+
+    def test_round_trips_blank_language_codes(self):
+        PlaceholderFactory(name='First', langcode='', content='Hello')
+        for format_ in ('jsonl', 'csv'):
+            out = io.StringIO()
+            export_placeholders(out, format_)
+            import_placeholders(io.StringIO(out.getvalue()), format_)
+            self.assertEqual('Hello', Placeholder.objects.get().content)
+            self.assertEqual('', Placeholder.objects.get().langcode)
+
+    def test_guesses_the_format_from_the_path(self):
+        self.assertEqual('csv', guess_placeholder_format('content.CSV'))
+        self.assertEqual('jsonl', guess_placeholder_format('content.jsonl'))
+        self.assertEqual('jsonl', guess_placeholder_format('-'))
@@ -0,0 +1,110 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from pyeti.eti_django.pages.factories import PlaceholderFactory
+from pyeti.eti_django.pages.utils import (
+    PlaceholderChoices, get_missing_placeholders, get_placeholders,
+    placeholder_choices,
+)
+
+DJANGO_TEMPLATES = 'django.template.backends.django.DjangoTemplates'
+
+
+@mock.patch('pyeti.eti_django.pages.utils.get_placeholders')
+class PlaceholderChoicesTests(SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__subject = PlaceholderChoices()
+
+    def test_returns_sorted_name_choices(self, mock_get_placeholders):
+        mock_get_placeholders.return_value = {'b', 'a'}
+        self.assertEqual([('a', 'a'), ('b', 'b')], self.__subject.names)
+
+    def test_memoizes_name_choices(self, mock_get_placeholders):
+        mock_get_placeholders.return_value = {'a'}
+        self.__subject.names
+        self.__subject.names
+        mock_get_placeholders.assert_called_once_with()
+
+    def test_reset_clears_the_memoized_choices(self, mock_get_placeholders):
+        mock_get_placeholders.return_value = {'a'}
+        self.__subject.names
+        mock_get_placeholders.return_value = {'b'}
+        self.__subject.reset()
+        self.assertEqual([('b', 'b')], self.__subject.names)
+
+    def test_warm_computes_the_choices(self, mock_get_placeholders):
+        mock_get_placeholders.return_value = {'a'}
+        self.__subject.warm()
+        mock_get_placeholders.assert_called_once_with()
+
+    def test_warm_logs_discovery_errors(self, mock_get_placeholders):
+        mock_get_placeholders.side_effect = OSError
+        with self.assertLogs('pyeti.eti_django.pages.utils', 'ERROR'):
+            self.__subject.warm()
+        mock_get_placeholders.side_effect = None
+        mock_get_placeholders.return_value = {'a'}
+        self.assertEqual([('a', 'a')], self.__subject.names)
+
+    @override_settings(LANGUAGES=[('en', 'English')])
+    def test_returns_the_configured_languages(self, mock_get_placeholders):
+        self.assertEqual([('en', 'English')], self.__subject.languages)
+
+    def test_is_reset_when_languages_change(self, mock_get_placeholders):
+        with override_settings(LANGUAGES=[('en', 'English')]):
+            self.assertEqual([('en', 'English')], placeholder_choices.languages)
+        self.assertNotEqual([('en', 'English')], placeholder_choices.languages)
+
+
+class GetPlaceholdersTests(SimpleTestCase):
+
+    def test_finds_placeholders_in_template_dirs(self):
+        with tempfile.TemporaryDirectory() as template_dir:
+            with open(os.path.join(template_dir, 'page.html'), 'w') as file_:
+                file_.write('{% placeholder "Page Content" %}')
+            with open(os.path.join(template_dir, 'logo.png'), 'wb') as file_:
+                file_.write(b'\x89PNG\xff\xfe')
+            with override_settings(TEMPLATES=[{'BACKEND': DJANGO_TEMPLATES, 'DIRS': [template_dir]}]):
+                self.assertIn('Page Content', get_placeholders())
+
+    @override_settings(TEMPLATES=[])
+    def test_works_without_templates(self):
+        self.assertIsInstance(get_placeholders(), set)
+        apps.get_app_config('pages').ready()
+
+
+@override_settings(LANGUAGES=[('en', 'English'), ('es', 'Spanish')])
+class GetMissingPlaceholdersTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('pyeti.eti_django.pages.utils.get_placeholders')
+        patcher.start().return_value = {'First', 'Second'}
+        self.addCleanup(patcher.stop)
+        self.addCleanup(placeholder_choices.reset)
+        placeholder_choices.reset()
+
+    def test_returns_placeholders_without_content_by_language(self):
+        PlaceholderFactory(name='First', langcode='en')
+        PlaceholderFactory(name='Second', langcode='en')
+        PlaceholderFactory(name='Second', langcode='es')
+        self.assertEqual(
+            {'en': [], 'es': ['First']},
+            get_missing_placeholders(),
+        )
+
+    def test_ignores_records_for_undiscovered_placeholders(self):
+        PlaceholderFactory(name='Other', langcode='en')
+        self.assertEqual(
+            {'en': ['First', 'Second'], 'es': ['First', 'Second']},
+            get_missing_placeholders(),
+        )
+
+    def test_uses_a_single_query(self):
+        with self.assertNumQueries(1):
+            get_missing_placeholders()
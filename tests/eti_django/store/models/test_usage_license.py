@@ -2,6 +2,7 @@ from datetime import timedelta
 from unittest import mock
 
 import dateutil.parser
+import requests
 from django.test import TestCase, override_settings
 from django.utils import timezone
 from faker import Faker
@@ -11,6 +12,8 @@ from pyeti.eti_django.store.client import (
 )
 from pyeti.eti_django.store.exceptions import SubscriptionDoesNotExist
 from pyeti.eti_django.store.factories import UsageLicenseFactory
+from pyeti.eti_django.store.models import UsageLicense
+from pyeti.eti_django.store.results import SUBSCRIPTION_NOT_FOUND, Subscription
 
 _faker = Faker()
 
@@ -101,6 +104,63 @@ class SyncFromStoreTests(TestCase):
         self.assertRaises(SubscriptionDoesNotExist, self.__subject.sync_from_store, self.__store)
 
 
+@override_settings(PYETI_STORE_DISABLE_LICENSE_CHECK=False, PYETI_STORE_USAGE_LICENSE_EXTRA_FIELDS=['school'])
+class QuerySetSyncFromStoreTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__found = UsageLicenseFactory(num_seats=1)
+        self.__missing = UsageLicenseFactory(num_seats=1)
+        self.__start = timezone.now() - timedelta(days=1)
+        self.__end = timezone.now() + timedelta(days=30)
+        self.__store = mock.Mock()
+        self.__store.get_subscriptions.return_value = {
+            str(self.__found.token): Subscription(
+                self.__found.token, 25, self.__start, self.__end, 'R123', 200, {'school': 'Central'},
+            ),
+            str(self.__missing.token): SUBSCRIPTION_NOT_FOUND,
+        }
+
+    def test_looks_up_every_license_at_once(self):
+        UsageLicense.objects.all().sync_from_store(self.__store, max_workers=4)
+        self.__store.get_subscriptions.assert_called_once_with(
+            mock.ANY, extra_fields=['school'], max_workers=4, return_exceptions=True,
+        )
+        self.assertEqual(
+            {str(self.__found.token), str(self.__missing.token)},
+            set(self.__store.get_subscriptions.call_args[0][0]),
+        )
+
+    def test_saves_the_synced_licenses(self):
+        UsageLicense.objects.all().sync_from_store(self.__store)
+        self.__found.refresh_from_db()
+        self.assertEqual(25, self.__found.num_seats)
+        self.assertEqual(self.__end, self.__found.end_date)
+        self.assertEqual('R123', self.__found.spree_order_number)
+        self.assertEqual({'school': 'Central'}, self.__found.extra)
+
+    def test_returns_the_licenses_that_were_not_found(self):
+        missing = UsageLicense.objects.all().sync_from_store(self.__store)
+        self.assertEqual([self.__missing], missing)
+        self.__missing.refresh_from_db()
+        self.assertEqual(1, self.__missing.num_seats)
+
+    def test_saves_the_synced_licenses_before_raising_lookup_errors(self):
+        failed = UsageLicenseFactory(num_seats=1)
+        error = requests.ReadTimeout()
+        self.__store.get_subscriptions.return_value[str(failed.token)] = error
+
+        with self.assertRaises(requests.ReadTimeout) as context, \
+                self.assertLogs('pyeti.eti_django.store.models', 'WARNING'):
+            UsageLicense.objects.all().sync_from_store(self.__store)
+
+        self.assertIs(error, context.exception)
+        self.__found.refresh_from_db()
+        self.assertEqual(25, self.__found.num_seats)
+        failed.refresh_from_db()
+        self.assertEqual(1, failed.num_seats)
+
+
 class StoreOrderLinkTests(TestCase):
 
     def setUp(self):
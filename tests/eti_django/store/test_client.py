@@ -0,0 +1,632 @@
+import json
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from unittest import TestCase, mock
+
+import requests
+from django.core.cache import cache
+
+from pyeti.eti_django.store.breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker,
+)
+from pyeti.eti_django.store.cache import ResponseCache
+from pyeti.eti_django.store.client import Store
+from pyeti.eti_django.store.exceptions import PageError, StoreUnavailable
+from pyeti.eti_django.store.metrics import Histogram, StoreMetrics
+from pyeti.eti_django.store.ratelimit import TokenBucket, parse_retry_after
+from pyeti.eti_django.store.signals import store_request_finished
+
+
+class StoreRequestTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        sleep_patcher = mock.patch('pyeti.eti_django.store.client.time.sleep')
+        self.__sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+        self.__subject = Store(
+            'https://store.example.com/', 'token', connect_timeout=1, read_timeout=5,
+            retries=2, backoff=0.5, circuit_breaker_threshold=2,
+        )
+        session_patcher = mock.patch.object(self.__subject, '_session')
+        self.__session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+
+    def test_uses_separate_connect_and_read_timeouts(self):
+        self.__session.request.return_value = _response(200, {})
+        self.__subject.product(1)
+        self.assertEqual((1, 5), self.__session.request.call_args[1]['timeout'])
+
+    def test_retries_gets_on_connection_errors(self):
+        response = _response(200)
+        self.__session.request.side_effect = [requests.ConnectionError(), requests.ConnectTimeout(), response]
+        with self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+            self.assertIs(response, self.__subject._do_request('products'))
+        self.assertEqual(3, self.__session.request.call_count)
+
+    def test_does_not_retry_read_timeouts(self):
+        self.__session.request.side_effect = requests.ReadTimeout()
+        with self.assertRaises(requests.ReadTimeout):
+            self.__subject._do_request('products')
+        self.assertEqual(1, self.__session.request.call_count)
+
+    def test_retries_gets_on_gateway_errors(self):
+        response = _response(200)
+        self.__session.request.side_effect = [_response(503), response]
+        with self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+            self.assertIs(response, self.__subject._do_request('products'))
+
+    def test_returns_the_last_gateway_error(self):
+        self.__session.request.return_value = _response(502)
+        with self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+            self.assertEqual(502, self.__subject._do_request('products').status_code)
+        self.assertEqual(3, self.__session.request.call_count)
+
+    def test_gives_up_after_the_retries(self):
+        self.__session.request.side_effect = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError), self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+            self.__subject._do_request('products')
+        self.assertEqual(3, self.__session.request.call_count)
+
+    def test_does_not_retry_other_methods(self):
+        self.__session.request.side_effect = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError):
+            self.__subject.create_user('user@example.com', 'password')
+        self.assertEqual(1, self.__session.request.call_count)
+
+    def test_backs_off_with_jitter(self):
+        self.__session.request.side_effect = requests.ConnectionError()
+        with mock.patch('pyeti.eti_django.store.client.random.uniform', return_value=0.1) as uniform:
+            with self.assertRaises(requests.ConnectionError), self.assertLogs('pyeti.eti_django.store.client'):
+                self.__subject._do_request('products')
+        uniform.assert_has_calls([mock.call(0, 0.5), mock.call(0, 1.0)])
+        self.__sleep.assert_has_calls([mock.call(0.1), mock.call(0.1)])
+
+    def test_fails_fast_once_the_circuit_opens(self):
+        self.__session.request.side_effect = requests.ConnectionError()
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError), self.assertLogs('pyeti.eti_django.store.client'):
+                self.__subject._do_request('products')
+        self.__session.request.reset_mock()
+
+        with self.assertRaises(StoreUnavailable):
+            self.__subject._do_request('products')
+        self.__session.request.assert_not_called()
+
+    def test_releases_the_trial_request_whatever_it_raises(self):
+        self.__subject.circuit_breaker._now = lambda: now
+        now = 0
+        self.__session.request.side_effect = requests.ConnectionError()
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError), self.assertLogs('pyeti.eti_django.store.client'):
+                self.__subject._do_request('products')
+
+        now = 30
+        self.__session.request.side_effect = requests.exceptions.ChunkedEncodingError()
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            self.__subject._do_request('products')
+        self.assertEqual(OPEN, self.__subject.circuit_breaker.state)
+
+        now = 60
+        self.__session.request.side_effect = None
+        self.__session.request.return_value = _response(200)
+        self.assertEqual(200, self.__subject._do_request('products').status_code)
+        self.assertEqual(CLOSED, self.__subject.circuit_breaker.state)
+
+    def test_successes_keep_the_circuit_closed(self):
+        self.__session.request.side_effect = [requests.ConnectionError(), _response(200, {})]
+        with self.assertRaises(requests.ConnectionError):
+            self.__subject.create_user('user@example.com', 'password')
+        self.__subject.create_user('user@example.com', 'password')
+        self.assertEqual(CLOSED, self.__subject.circuit_breaker.state)
+
+
+class StoreInstrumentationTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        sleep_patcher = mock.patch('pyeti.eti_django.store.client.time.sleep')
+        sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+        self.__subject = Store('https://store.example.com/', 'token', retries=1)
+        session_patcher = mock.patch.object(self.__subject, '_session')
+        self.__session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+
+        self.__receiver = mock.Mock()
+        store_request_finished.connect(self.__receiver)
+        self.addCleanup(store_request_finished.disconnect, self.__receiver)
+
+    def test_sends_a_signal_per_call(self):
+        self.__session.request.return_value = _response(200, {})
+        self.__subject.subscription(None, 'abc')
+        self.__receiver.assert_called_once_with(
+            signal=store_request_finished, sender=Store, endpoint='subscription', method='get',
+            duration=mock.ANY, status_code=200, size=2, retries=0, error=None,
+        )
+
+    def test_labels_calls_by_api_method(self):
+        self.__session.request.return_value = _response(200, {'orders': [], 'pages': 1})
+        list(self.__subject.iter_orders())
+        self.__subject.orders_by_user(1)
+        self.assertEqual(
+            ['orders', 'orders_by_user'],
+            [call[1]['endpoint'] for call in self.__receiver.call_args_list],
+        )
+
+    def test_records_retries_and_errors(self):
+        self.__session.request.side_effect = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError), self.assertLogs('pyeti.eti_django.store.client'):
+            self.__subject.product(1)
+
+        kwargs = self.__receiver.call_args[1]
+        self.assertEqual(1, kwargs['retries'])
+        self.assertIsNone(kwargs['status_code'])
+        self.assertIsInstance(kwargs['error'], requests.ConnectionError)
+
+    def test_records_metrics(self):
+        self.__session.request.side_effect = [_response(503), _response(200, {})]
+        with self.assertLogs('pyeti.eti_django.store.client'):
+            self.__subject.product(1)
+        self.__session.request.side_effect = None
+        self.__session.request.return_value = _response(500, {})
+        self.__subject.product(1)
+
+        metrics = self.__subject.metrics.snapshot()['product']
+        self.assertEqual(2, metrics['count'])
+        self.assertEqual({200: 1, 500: 1}, metrics['statuses'])
+        self.assertEqual(1, metrics['errors'])
+        self.assertEqual(1, metrics['retries'])
+        self.assertEqual(4, metrics['bytes'])
+
+    def test_logs_undecodable_responses(self):
+        response = _response(200)
+        response.url = 'https://store.example.com/api/v1/products'
+        response.text = 'Oops'
+        response.content = b'Oops'
+        response.json.side_effect = ValueError('Expecting value')
+        self.__session.request.return_value = response
+        with self.assertLogs('pyeti.eti_django.store.client', 'ERROR'):
+            self.assertIsNone(self.__subject.products())
+
+
+class StoreMetricsTests(TestCase):
+
+    def test_buckets_durations(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for duration in (0.05, 0.1, 0.5, 3):
+            histogram.observe(duration)
+        self.assertEqual([(0.1, 2), (1, 3), (float('inf'), 4)], histogram.cumulative())
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(3.65, histogram.sum)
+
+    def test_counts_exceptions_as_errors(self):
+        metrics = StoreMetrics()
+        metrics.record('orders', 0.2, error=requests.Timeout())
+        self.assertEqual(1, metrics.snapshot()['orders']['errors'])
+
+    def test_resets(self):
+        metrics = StoreMetrics()
+        metrics.record('orders', 0.2, status_code=200)
+        metrics.reset()
+        self.assertEqual({}, metrics.snapshot())
+
+
+class StoreRateLimitTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        sleep_patcher = mock.patch('pyeti.eti_django.store.client.time.sleep')
+        self.__sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+        self.__subject = Store('https://store.example.com/', 'token', retries=2, max_concurrency=2)
+        session_patcher = mock.patch.object(self.__subject, '_session')
+        self.__session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        self.__subject.rate_limiter = mock.Mock()
+
+    def test_waits_for_the_rate_limiter(self):
+        self.__session.request.return_value = _response(200)
+        self.__subject._do_request('products')
+        self.__subject.rate_limiter.acquire.assert_called_once_with()
+
+    def test_pauses_for_retry_after_on_429s(self):
+        response = _response(200)
+        self.__session.request.side_effect = [_response(429, headers={'Retry-After': '3'}), response]
+        with self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+            self.assertIs(response, self.__subject._do_request('users', method='post'))
+        self.__subject.rate_limiter.pause.assert_called_once_with(3)
+        self.assertEqual(2, self.__subject.rate_limiter.acquire.call_count)
+        self.__sleep.assert_not_called()
+
+    def test_backs_off_on_429s_without_retry_after(self):
+        self.__session.request.side_effect = [_response(429), _response(200)]
+        with self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+            self.__subject._do_request('products')
+        self.__sleep.assert_called_once()
+
+    def test_does_not_wait_out_long_retry_afters(self):
+        self.__session.request.return_value = _response(429, headers={'Retry-After': '3600'})
+        self.assertEqual(429, self.__subject._do_request('products').status_code)
+        self.__session.request.assert_called_once()
+
+    def test_429s_do_not_open_the_circuit(self):
+        self.__session.request.return_value = _response(429, headers={'Retry-After': '0'})
+        for _ in range(5):
+            with self.assertLogs('pyeti.eti_django.store.client', 'INFO'):
+                self.__subject._do_request('products')
+        self.assertEqual(CLOSED, self.__subject.circuit_breaker.state)
+
+    def test_caps_concurrent_requests(self):
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def request(*args, **kwargs):
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            # time.sleep is mocked out.
+            threading.Event().wait(0.02)
+            with lock:
+                in_flight.pop()
+            return _response(200)
+        self.__session.request.side_effect = request
+
+        threads = [threading.Thread(target=self.__subject._do_request, args=('products',)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(2, max(peak))
+
+
+class TokenBucketTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__now = 0
+        self.__sleeps = []
+
+        def sleep(seconds):
+            self.__sleeps.append(seconds)
+            self.__now += seconds
+
+        with mock.patch.object(TokenBucket, '_now', lambda _: self.__now):
+            self.__subject = TokenBucket(rate=2, burst=2)
+        self.__subject._now = lambda: self.__now
+        self.__subject._sleep = sleep
+
+    def test_allows_bursts(self):
+        self.__subject.acquire()
+        self.__subject.acquire()
+        self.assertEqual([], self.__sleeps)
+
+    def test_waits_for_tokens_to_refill(self):
+        for _ in range(3):
+            self.__subject.acquire()
+        self.assertEqual([0.5], self.__sleeps)
+
+    def test_refills_over_time(self):
+        self.__subject.acquire()
+        self.__subject.acquire()
+        self.__now += 1
+        self.__subject.acquire()
+        self.__subject.acquire()
+        self.assertEqual([], self.__sleeps)
+
+    def test_waits_out_pauses(self):
+        self.__subject.pause(3)
+        self.__subject.acquire()
+        self.assertEqual([3], self.__sleeps)
+
+    def test_only_pauses_without_a_rate(self):
+        subject = TokenBucket()
+        for _ in range(100):
+            subject.acquire()
+
+
+class ParseRetryAfterTests(TestCase):
+
+    def test_parses_seconds(self):
+        self.assertEqual(120, parse_retry_after('120'))
+
+    def test_parses_dates(self):
+        with mock.patch('pyeti.eti_django.store.ratelimit.timezone.now') as now:
+            now.return_value = parsedate_to_datetime('Wed, 21 Oct 2015 07:28:00 GMT')
+            self.assertEqual(30, parse_retry_after('Wed, 21 Oct 2015 07:28:30 GMT'))
+
+    def test_ignores_garbage(self):
+        for value in (None, '', 'soon'):
+            self.assertIsNone(parse_retry_after(value))
+
+
+class StoreCacheTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.__subject = Store(
+            'https://store.example.com/', 'token', group='math',
+            cache=ResponseCache({'products': 60, 'product': 60}),
+        )
+        session_patcher = mock.patch.object(self.__subject, '_session')
+        self.__session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+        self.__session.request.return_value = _response(200, {'products': []})
+
+    def test_caches_configured_endpoints(self):
+        self.assertEqual({'products': []}, self.__subject.products(page=1))
+        self.assertEqual({'products': []}, self.__subject.products(page=1))
+        self.__session.request.assert_called_once_with(
+            'get', 'https://store.example.com/api/v1/products', params={'page': 1, 'group': 'math'},
+            headers=mock.ANY, timeout=mock.ANY, verify=mock.ANY,
+        )
+
+    def test_keys_on_the_params(self):
+        self.__subject.products(page=1)
+        self.__subject.products(page=2)
+        self.__subject.product(1)
+        self.__subject.product(2)
+        self.assertEqual(4, self.__session.request.call_count)
+
+    def test_keys_on_the_group(self):
+        self.__subject.products()
+        other = Store('https://store.example.com/', 'token', group='science', cache=self.__subject.cache)
+        with mock.patch.object(other, '_session', self.__session):
+            other.products()
+        self.assertEqual(2, self.__session.request.call_count)
+
+    def test_does_not_cache_other_endpoints(self):
+        self.__subject.webinars()
+        self.__subject.webinars()
+        self.assertEqual(2, self.__session.request.call_count)
+
+    def test_does_not_cache_error_responses(self):
+        self.__session.request.return_value = _response(404, {'error': 'Not found'})
+        self.assertEqual({'error': 'Not found'}, self.__subject.product(1))
+        self.__session.request.return_value = _response(200, {'id': 1})
+        self.assertEqual({'id': 1}, self.__subject.product(1))
+        self.assertEqual(2, self.__session.request.call_count)
+
+    def test_invalidates_one_response(self):
+        self.__subject.product(1)
+        self.__subject.product(2)
+        self.__subject.invalidate('product', 1)
+        self.__subject.product(1)
+        self.__subject.product(2)
+        self.assertEqual(3, self.__session.request.call_count)
+
+    def test_invalidates_every_response(self):
+        self.__subject.product(1)
+        self.__subject.products()
+        self.__subject.invalidate_all()
+        self.__subject.product(1)
+        self.__subject.products()
+        self.assertEqual(4, self.__session.request.call_count)
+
+    def test_coalesces_concurrent_misses(self):
+        def slow_request(*args, **kwargs):
+            time.sleep(0.05)
+            return _response(200, {'products': []})
+        self.__session.request.side_effect = slow_request
+
+        threads = [threading.Thread(target=self.__subject.products) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.__session.request.assert_called_once()
+
+
+class StoreConditionalRequestTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.__subject = Store('https://store.example.com/', 'token', cache=ResponseCache({'products': 60}))
+        session_patcher = mock.patch.object(self.__subject, '_session')
+        self.__session = session_patcher.start()
+        self.addCleanup(session_patcher.stop)
+
+        time_patcher = mock.patch('pyeti.eti_django.store.cache.time.time', return_value=1000)
+        self.__time = time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+    def test_revalidates_expired_responses(self):
+        self.__session.request.side_effect = [
+            _response(200, {'products': [1]}, {'ETag': '"abc"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}),
+            _response(304),
+        ]
+        self.__subject.products()
+        self.__time.return_value += 61
+
+        self.assertEqual({'products': [1]}, self.__subject.products())
+        headers = self.__session.request.call_args[1]['headers']
+        self.assertEqual('"abc"', headers['If-None-Match'])
+        self.assertEqual('Wed, 21 Oct 2015 07:28:00 GMT', headers['If-Modified-Since'])
+        self.assertEqual('token', headers['X-Spree-Token'])
+
+    def test_renews_not_modified_responses(self):
+        self.__session.request.side_effect = [
+            _response(200, {'products': [1]}, {'ETag': '"abc"'}),
+            _response(304),
+        ]
+        self.__subject.products()
+        self.__time.return_value += 61
+        self.__subject.products()
+        self.__time.return_value += 59
+        self.__subject.products()
+        self.assertEqual(2, self.__session.request.call_count)
+
+    def test_replaces_modified_responses(self):
+        self.__session.request.side_effect = [
+            _response(200, {'products': [1]}, {'ETag': '"abc"'}),
+            _response(200, {'products': [2]}, {'ETag': '"def"'}),
+        ]
+        self.__subject.products()
+        self.__time.return_value += 61
+        self.assertEqual({'products': [2]}, self.__subject.products())
+
+    def test_sends_unconditional_requests_without_validators(self):
+        self.__session.request.return_value = _response(200, {'products': [1]})
+        self.__subject.products()
+        self.__time.return_value += 61
+        self.__subject.products()
+        self.assertNotIn('If-None-Match', self.__session.request.call_args[1]['headers'])
+        self.assertNotIn('If-Modified-Since', self.__session.request.call_args[1]['headers'])
+
+
+class StorePaginationTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__subject = Store('https://store.example.com/', 'token')
+        self.__pages = {
+            1: {'orders': [1, 2], 'current_page': 1, 'pages': 3},
+            2: {'orders': [3, 4], 'current_page': 2, 'pages': 3},
+            3: {'orders': [5], 'current_page': 3, 'pages': 3},
+        }
+        patcher = mock.patch.object(
+            self.__subject, '_do_json', side_effect=lambda path, params: self.__pages[params['page']],
+        )
+        self.__do_json = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_yields_records_from_every_page(self):
+        self.assertEqual([1, 2, 3, 4, 5], list(self.__subject.iter_orders(per_page=2, state='complete')))
+        self.__do_json.assert_has_calls([
+            mock.call('orders', params={'page': page, 'per_page': 2, 'state': 'complete'}) for page in (1, 2, 3)
+        ])
+
+    def test_requests_pages_lazily(self):
+        orders = self.__subject.iter_orders(per_page=2)
+        self.assertEqual([1, 2, 3], [next(orders) for _ in range(3)])
+        self.assertEqual(2, self.__do_json.call_count)
+
+    def test_prefetches_the_next_page(self):
+        requested = threading.Event()
+
+        def do_json(path, params):
+            if params['page'] == 2:
+                requested.set()
+            return self.__pages[params['page']]
+        self.__do_json.side_effect = do_json
+
+        orders = self.__subject.iter_orders(per_page=2, prefetch=True)
+        self.assertEqual(1, next(orders))
+        self.assertTrue(requested.wait(1))
+        self.assertEqual(2, self.__do_json.call_count)
+        self.assertEqual([2, 3, 4, 5], list(orders))
+        self.assertEqual(3, self.__do_json.call_count)
+
+    def test_stops_at_an_empty_page(self):
+        self.__pages[2] = {'orders': [], 'pages': 3}
+        self.assertEqual([1, 2], list(self.__subject.iter_orders(per_page=2)))
+
+    def test_raises_when_a_page_cannot_be_decoded(self):
+        self.__pages[2] = None
+        orders = self.__subject.iter_orders(per_page=2, prefetch=True)
+        self.assertEqual([1, 2], [next(orders), next(orders)])
+        with self.assertRaises(PageError):
+            next(orders)
+
+    def test_raises_on_error_pages(self):
+        self.__pages[2] = {'error': 'Internal Server Error'}
+        with self.assertRaises(PageError):
+            list(self.__subject.iter_orders(per_page=2))
+
+    def test_follows_listings_without_a_page_count(self):
+        self.__pages = {
+            1: {'webinar_registrations': [1, 2]},
+            2: {'webinar_registrations': [3, 4]},
+            3: {'webinar_registrations': [5]},
+        }
+        self.assertEqual([1, 2, 3, 4, 5], list(self.__subject.iter_webinar_registrations(per_page=2)))
+
+    def test_stops_listings_without_a_page_count_at_an_empty_page(self):
+        self.__pages = {1: {'webinar_registrations': [1, 2]}, 2: {'webinar_registrations': []}}
+        self.assertEqual([1, 2], list(self.__subject.iter_webinar_registrations(per_page=2)))
+
+    def test_pages_through_users_and_webinar_registrations(self):
+        self.__pages = {1: {'users': ['user'], 'webinar_registrations': ['registration'], 'pages': 1}}
+        self.assertEqual(['user'], list(self.__subject.iter_users()))
+        self.assertEqual(['registration'], list(self.__subject.iter_webinar_registrations()))
+
+
+class ResponseCacheTests(TestCase):
+
+    def test_makes_the_same_key_regardless_of_param_order(self):
+        subject = ResponseCache({})
+        self.assertEqual(
+            subject.make_key('products', {'page': 1, 'group': 'math'}),
+            subject.make_key('products', {'group': 'math', 'page': '1'}),
+        )
+        self.assertNotEqual(
+            subject.make_key('products', {'page': 1}),
+            subject.make_key('products', {'page': 2}),
+        )
+
+
+class CircuitBreakerTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__now = 0
+        self.__subject = CircuitBreaker(failure_threshold=2, cooldown=10)
+        self.__subject._now = lambda: self.__now
+
+    def test_opens_after_repeated_failures(self):
+        self.__subject.record_failure()
+        self.assertTrue(self.__subject.allow_request())
+        self.__subject.record_failure()
+        self.assertEqual(OPEN, self.__subject.state)
+        self.assertFalse(self.__subject.allow_request())
+
+    def test_successes_reset_the_failure_count(self):
+        self.__subject.record_failure()
+        self.__subject.record_success()
+        self.__subject.record_failure()
+        self.assertEqual(CLOSED, self.__subject.state)
+
+    def test_lets_one_trial_request_through_after_the_cooldown(self):
+        self.__subject.record_failure()
+        self.__subject.record_failure()
+        self.__now = 10
+        self.assertEqual(HALF_OPEN, self.__subject.state)
+        self.assertTrue(self.__subject.allow_request())
+        self.assertFalse(self.__subject.allow_request())
+
+    def test_closes_when_the_trial_succeeds(self):
+        self.__subject.record_failure()
+        self.__subject.record_failure()
+        self.__now = 10
+        self.__subject.allow_request()
+        self.__subject.record_success()
+        self.assertEqual(CLOSED, self.__subject.state)
+
+    def test_reopens_when_the_trial_fails(self):
+        self.__subject.record_failure()
+        self.__subject.record_failure()
+        self.__now = 10
+        self.__subject.allow_request()
+        self.__subject.record_failure()
+        self.assertEqual(OPEN, self.__subject.state)
+        self.__now = 19
+        self.assertFalse(self.__subject.allow_request())
+
+
+def _response(status_code, body=None, headers=None):
+    response = mock.Mock(spec=requests.Response)
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = json.dumps(body).encode('utf-8') if body is not None else b''
+    response.json.return_value = body
+    return response
@@ -10,6 +10,7 @@ try:
 except ImportError:  # pragma: no cover
     _MIDDLEWARE_TAKES_ARG = False
 
+from pyeti.eti_django.store.exceptions import StoreUnavailable
 from pyeti.eti_django.store.middleware import SubscriptionMiddleware
 
 
@@ -145,6 +146,27 @@ class SubscriptionMiddlewareTests(TestCase):
         response = self.__subject(self.__request)
         self.assertRedirects(response, '/expired-license/', fetch_redirect_response=False)
 
+    def test_keeps_using_the_license_if_the_store_is_unavailable(self):
+        ulicense = mock.Mock()
+        ulicense.is_expired = False
+        ulicense.needs_sync = True
+        ulicense.sync_from_store.side_effect = StoreUnavailable()
+        self.__request.user.usage_license = ulicense
+
+        with self.assertLogs('pyeti.eti_django.store.middleware', 'WARNING'):
+            self.assertIsNone(self.__subject(self.__request))
+        ulicense.save.assert_not_called()
+
+    def test_redirects_expired_licenses_if_the_store_is_unavailable(self):
+        ulicense = mock.Mock()
+        ulicense.is_expired = True
+        ulicense.sync_from_store.side_effect = StoreUnavailable()
+        self.__request.user.usage_license = ulicense
+
+        with self.assertLogs('pyeti.eti_django.store.middleware', 'WARNING'):
+            response = self.__subject(self.__request)
+        self.assertRedirects(response, '/expired-license/', fetch_redirect_response=False)
+
     def test_returns_for_anonymous_users(self):
         self.__request.user = AnonymousUser()
         self.assertIsNone(self.__subject(self.__request))
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from unittest import TestCase, mock
+
+import requests
+
+from pyeti.eti_django.store.client import Store, decode_json
+from pyeti.eti_django.store.results import SUBSCRIPTION_NOT_FOUND, Subscription
+from pyeti.eti_django.store.testing import SpreeStubServer
+
+
+class SubscriptionTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__payload = {
+            'registration_code': 'abc',
+            'num_seats': 30,
+            'start': '2018-09-01T00:00:00.000Z',
+            'end': '2019-09-01T00:00:00.000Z',
+            'order_number': 'R123',
+            'school': 'Central',
+            'notes': 'Lots of text we do not need',
+        }
+
+    def test_parses_the_payload(self):
+        subscription = Subscription.from_payload(self.__payload, 200)
+        self.assertEqual('abc', subscription.registration_code)
+        self.assertEqual(30, subscription.num_seats)
+        self.assertEqual(datetime(2018, 9, 1, tzinfo=timezone.utc), subscription.start)
+        self.assertEqual(datetime(2019, 9, 1, tzinfo=timezone.utc), subscription.end)
+        self.assertEqual('R123', subscription.order_number)
+        self.assertFalse(subscription.is_lapsed)
+
+    def test_keeps_only_the_extra_fields_asked_for(self):
+        subscription = Subscription.from_payload(self.__payload, 200, extra_fields=['school', 'missing'])
+        self.assertEqual({'school': 'Central', 'missing': None}, subscription.extra)
+
+    def test_is_slotted(self):
+        subscription = Subscription.from_payload(self.__payload, 200)
+        self.assertFalse(hasattr(subscription, '__dict__'))
+
+    def test_knows_when_it_is_lapsed(self):
+        self.assertTrue(Subscription.from_payload(self.__payload, 211).is_lapsed)
+
+
+class DecodeJsonTests(TestCase):
+
+    def test_decodes_the_content(self):
+        response = mock.Mock(content=b'{"num_seats": 30}')
+        self.assertEqual({'num_seats': 30}, decode_json(response))
+
+    def test_raises_value_error_for_invalid_json(self):
+        with self.assertRaises(ValueError):
+            decode_json(mock.Mock(content=b'Oops'))
+
+    @mock.patch('pyeti.eti_django.store.client.orjson', None)
+    def test_falls_back_to_the_response_decoder(self):
+        response = mock.Mock(content=b'{"num_seats": 30}')
+        response.json.return_value = {'num_seats': 30}
+        self.assertEqual({'num_seats': 30}, decode_json(response))
+        response.json.assert_called_once_with()
+
+
+class GetSubscriptionTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__server = SpreeStubServer().start()
+        self.addCleanup(self.__server.stop)
+        self.__store = Store(self.__server.url, 'token', retries=0)
+
+    def test_returns_a_subscription(self):
+        self.__server.add_subscription('abc', num_seats=30, school='Central')
+        subscription = self.__store.get_subscription('abc', extra_fields=['school'])
+        self.assertEqual(30, subscription.num_seats)
+        self.assertEqual({'school': 'Central'}, subscription.extra)
+
+    def test_returns_lapsed_subscriptions(self):
+        self.__server.add_subscription('abc', lapsed=True)
+        self.assertTrue(self.__store.get_subscription('abc').is_lapsed)
+
+    def test_returns_none_for_unknown_codes(self):
+        self.assertIsNone(self.__store.get_subscription('missing'))
+
+
+class GetSubscriptionsTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__server = SpreeStubServer().start()
+        self.addCleanup(self.__server.stop)
+        self.__store = Store(self.__server.url, 'token', retries=0)
+
+    def test_maps_codes_to_subscriptions(self):
+        for code in ('a', 'b', 'c'):
+            self.__server.add_subscription(code, num_seats=len(code) * 10)
+        subscriptions = self.__store.get_subscriptions(['a', 'b', 'missing', 'c', 'a'], max_workers=2)
+        self.assertEqual(['a', 'b', 'missing', 'c'], list(subscriptions))
+        self.assertEqual('b', subscriptions['b'].registration_code)
+        self.assertIs(SUBSCRIPTION_NOT_FOUND, subscriptions['missing'])
+        self.assertEqual(4, self.__server.requests_served)
+
+    def test_returns_nothing_for_no_codes(self):
+        self.assertEqual({}, self.__store.get_subscriptions([]))
+
+    def test_raises_lookup_errors(self):
+        self.__server.error_rate = 1
+        with self.assertRaises(requests.HTTPError):
+            self.__store.get_subscriptions(['a', 'b'])
+
+    def test_can_return_lookup_errors(self):
+        self.__server.add_subscription('a')
+        original = self.__server.respond
+
+        def respond(method, path, query):
+            if query.get('registration_code') == 'b':
+                return 503, {'error': 'Service Unavailable'}
+            return original(method, path, query)
+        self.__server.respond = respond
+
+        subscriptions = self.__store.get_subscriptions(['a', 'b'], return_exceptions=True)
+        self.assertEqual('a', subscriptions['a'].registration_code)
+        self.assertIsInstance(subscriptions['b'], requests.HTTPError)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from pyeti.eti_django.store.client import (
+    LAPSED_SUBSCRIPTION_STATUS_CODE, NO_SUBSCRIPTION_STATUS_CODE,
+    SUBSCRIPTION_OK_STATUS_CODE, Store,
+)
+from pyeti.eti_django.store.testing import SpreeStubServer
+
+
+class SpreeStubServerTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__server = SpreeStubServer(users=3, orders=5, seed=1).start()
+        self.addCleanup(self.__server.stop)
+        self.__store = Store(self.__server.url, 'token', retries=0)
+
+    def test_answers_subscription_lookups(self):
+        self.__server.add_subscription('abc', num_seats=30)
+        response = self.__store.subscription(None, 'abc', show_details=True)
+        self.assertEqual(SUBSCRIPTION_OK_STATUS_CODE, response.status_code)
+        self.assertEqual(30, response.json()['num_seats'])
+
+    def test_answers_lapsed_and_unknown_subscriptions(self):
+        self.__server.add_subscription('lapsed', lapsed=True)
+        self.assertEqual(LAPSED_SUBSCRIPTION_STATUS_CODE, self.__store.subscription(None, 'lapsed').status_code)
+        self.assertEqual(NO_SUBSCRIPTION_STATUS_CODE, self.__store.subscription(None, 'missing').status_code)
+
+    def test_paginates_lists(self):
+        page = self.__store.orders(page=2, per_page=2)
+        self.assertEqual([3, 4], [order['id'] for order in page['orders']])
+        self.assertEqual(3, page['pages'])
+        self.assertEqual([1, 2, 3, 4, 5], [order['id'] for order in self.__store.iter_orders(per_page=2)])
+
+    def test_answers_detail_requests(self):
+        self.assertEqual(2, self.__store.user(2)['id'])
+        self.assertEqual(1, self.__store.product(1)['id'])
+        self.assertEqual(1, self.__store.webinar(1)['id'])
+        self.assertEqual(10, len(self.__store.webinars()['webinars']))
+        self.assertEqual({'error': 'Not found'}, self.__store.order(100))
+
+    def test_lists_orders_by_user(self):
+        orders = self.__store.orders_by_user(2)['orders']
+        self.assertTrue(orders)
+        self.assertEqual({2}, {order['user_id'] for order in orders})
+
+    def test_fails_requests_at_the_error_rate(self):
+        self.__server.error_rate = 1
+        self.assertEqual(503, self.__store.subscription(None, 'abc').status_code)
+        self.assertEqual(1, self.__server.requests_served)
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase, mock
+
+from dateutil import parser
+from faker import Faker
+
+from pyeti.eti_django.store.utils import parse_spree_datetime
+
+_faker = Faker()
+
+
+class ParseSpreeDatetimeTests(TestCase):
+
+    def test_parses_spree_timestamps(self):
+        self.assertEqual(
+            datetime(2018, 9, 1, 14, 30, 0, 123000, tzinfo=timezone.utc),
+            parse_spree_datetime('2018-09-01T14:30:00.123Z'),
+        )
+
+    def test_parses_offsets(self):
+        self.assertEqual(
+            datetime(2018, 9, 1, 14, 30, tzinfo=timezone(timedelta(hours=-5))),
+            parse_spree_datetime('2018-09-01T14:30:00-05:00'),
+        )
+
+    def test_parses_dates(self):
+        self.assertEqual(datetime(2018, 9, 1), parse_spree_datetime('2018-09-01'))
+
+    def test_matches_dateutil(self):
+        for string in [_faker.iso8601() for _ in range(20)] + ['20180901', '2018-09-01 14:30']:
+            self.assertEqual(parser.parse(string), parse_spree_datetime(string), string)
+
+    def test_does_not_use_dateutil_for_iso_strings(self):
+        with mock.patch('pyeti.eti_django.store.utils.parser.parse') as parse:
+            parse_spree_datetime('2018-09-01T14:30:00.000Z')
+        parse.assert_not_called()
+
+    def test_falls_back_to_dateutil(self):
+        self.assertEqual(datetime(2018, 9, 1), parse_spree_datetime('Sep 1 2018'))
+
+    def test_raises_for_garbage(self):
+        with self.assertRaises(ValueError):
+            parse_spree_datetime('not a date')
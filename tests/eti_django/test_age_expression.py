@@ -0,0 +1,100 @@
+from datetime import date, datetime, timezone
+from unittest import skipIf
+
+from django.db import connection, models
+from django.test import TestCase
+
+from pyeti.eti_django.models import AgeQuerySet, age_expression
+from pyeti.eti_django.store.factories import UsageLicenseFactory
+from pyeti.eti_django.store.models import UsageLicense
+from pyeti.utils import AgeMixin, ages_on, numpy
+
+
+class AgeExpressionTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__date = date(2018, 4, 1)
+        self.__expected = {
+            date(1953, 3, 31): 65,
+            date(1953, 5, 21): 64,
+            date(1953, 4, 2): 64,
+            date(2018, 4, 1): 0,
+            date(2018, 3, 31): 0,
+        }
+        for birth_date in self.__expected:
+            UsageLicenseFactory(
+                token=birth_date.isoformat(),
+                start_date=datetime(birth_date.year, birth_date.month, birth_date.day, 12, tzinfo=timezone.utc),
+            )
+
+    def test_computes_ages_in_the_database(self):
+        ages = dict(
+            UsageLicense.objects
+            .annotate(age=age_expression('start_date', on=self.__date))
+            .values_list('token', 'age')
+        )
+        self.assertEqual({k.isoformat(): v for k, v in self.__expected.items()}, ages)
+
+    def test_can_be_aggregated_in_one_query(self):
+        with self.assertNumQueries(1):
+            over_64 = (
+                UsageLicense.objects
+                .annotate(age=age_expression('start_date', on=self.__date))
+                .filter(age__gte=65)
+                .count()
+            )
+        self.assertEqual(1, over_64)
+
+    def test_queryset_uses_the_models_birth_date_field(self):
+        UsageLicense.BIRTH_DATE_FIELD = 'start_date'
+        self.addCleanup(delattr, UsageLicense, 'BIRTH_DATE_FIELD')
+
+        queryset = AgeQuerySet(UsageLicense).with_age(on=self.__date)
+        self.assertEqual(65, queryset.get(token='1953-03-31').age)  # noqa: S106
+
+
+class DateFieldAgeExpressionTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # The table is created inside the test's transaction, so it's rolled
+        # back with everything else.
+        with connection.schema_editor() as editor:
+            editor.create_model(_Person)
+        self.__birth_dates = [date(2000, 2, 29), date(2004, 2, 29), date(2001, 2, 28), date(2001, 3, 1)]
+        for birth_date in self.__birth_dates:
+            _Person.objects.create(birth_date=birth_date)
+
+    def test_matches_age_on_around_leap_days(self):
+        for on in (date(2019, 2, 28), date(2019, 3, 1), date(2020, 2, 28), date(2020, 2, 29)):
+            with self.subTest(on=on):
+                ages = dict(_Person.objects.with_age(on=on).values_list('birth_date', 'age'))
+                self.assertEqual(
+                    {birth_date: _Person(birth_date=birth_date).age_on(on) for birth_date in self.__birth_dates},
+                    ages,
+                )
+
+    def test_does_not_count_leap_day_birthdays_until_march_in_other_years(self):
+        ages = dict(_Person.objects.with_age(on=date(2019, 2, 28)).values_list('birth_date', 'age'))
+        self.assertEqual(18, ages[date(2000, 2, 29)])
+        self.assertEqual(18, ages[date(2001, 2, 28)])
+        ages = dict(_Person.objects.with_age(on=date(2019, 3, 1)).values_list('birth_date', 'age'))
+        self.assertEqual(19, ages[date(2000, 2, 29)])
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_matches_ages_on(self):
+        for on in (date(2019, 2, 28), date(2019, 3, 1), date(2020, 2, 28), date(2020, 2, 29)):
+            with self.subTest(on=on):
+                birth_dates, ages = zip(*_Person.objects.with_age(on=on).values_list('birth_date', 'age'))
+                self.assertEqual(list(ages_on(numpy.array(birth_dates, dtype='datetime64[D]'), on)), list(ages))
+
+
+class _Person(AgeMixin, models.Model):
+
+    birth_date = models.DateField()
+
+    objects = AgeQuerySet.as_manager()
+
+    class Meta:
+        app_label = 'pyeti.eti_django'
@@ -1,9 +1,20 @@
 import random
+import threading
+import time
+from datetime import timedelta
 from unittest import TestCase, mock
 
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.db.transaction import TransactionManagementError
+from django.test import TestCase as DjangoTestCase, TransactionTestCase
 from faker import Faker
 
-from pyeti.eti_django.db import LOCKS, lock
+from pyeti.eti_django.db import (
+    LOCK_ACCESS_EXCLUSIVE, LOCKS, LockNotAvailable, advisory_lock,
+    advisory_lock_key, advisory_xact_lock, lock,
+)
+from pyeti.eti_django.pages.models import Placeholder
+from pyeti.eti_django.signals import lock_finished
 
 fake = Faker()
 srandom = random.SystemRandom()
@@ -54,3 +65,224 @@ class LockTests(TestCase):
             method()
 
         method.assert_called_once_with()
+
+    def test_sets_a_lock_timeout(self):
+        cursor = mock.Mock()
+        cursor.fetchone.return_value = ('0',)
+        self.__connection.cursor = mock.Mock(return_value=cursor)
+
+        with lock(self.__model, self.__lock, timeout=timedelta(seconds=2)):
+            'hello'
+
+        cursor.execute.assert_has_calls([
+            mock.call("SELECT current_setting('lock_timeout')"),
+            mock.call("SET LOCAL lock_timeout = '2000ms'"),
+            mock.call('LOCK TABLE %s IN %s MODE' % (self.__db_table, self.__lock)),
+            mock.call("SELECT set_config('lock_timeout', %s, true)", ['0']),
+        ])
+
+    def test_can_fail_without_waiting(self):
+        cursor = mock.Mock()
+        self.__connection.cursor = mock.Mock(return_value=cursor)
+
+        with lock(self.__model, self.__lock, nowait=True):
+            'hello'
+
+        cursor.execute.assert_called_once_with(
+            'LOCK TABLE %s IN %s MODE NOWAIT' % (self.__db_table, self.__lock)
+        )
+
+    def test_raises_lock_not_available(self):
+        error = _operational_error('could not obtain lock', '55P03')
+        self.__connection.cursor.return_value.execute.side_effect = error
+
+        with self.assertRaises(LockNotAvailable), self.assertLogs('pyeti.eti_django.db', 'WARNING'):
+            with lock(self.__model, self.__lock, nowait=True):
+                self.fail('Should not get the lock')
+
+    def test_reraises_other_errors(self):
+        error = _operational_error('server closed the connection', '08006')
+        self.__connection.cursor.return_value.execute.side_effect = error
+
+        with self.assertRaises(OperationalError) as context:
+            with lock(self.__model, self.__lock):
+                'hello'
+        self.assertIs(context.exception, error)
+
+    def test_sends_timings(self):
+        receiver = mock.Mock()
+        lock_finished.connect(receiver)
+        self.addCleanup(lock_finished.disconnect, receiver)
+
+        with lock(self.__model, self.__lock):
+            'hello'
+
+        receiver.assert_called_once_with(
+            signal=lock_finished, sender=self.__model, lock_type=self.__lock,
+            acquired=True, waited=mock.ANY, held=mock.ANY,
+        )
+        self.assertGreaterEqual(receiver.call_args[1]['waited'], 0)
+        self.assertGreaterEqual(receiver.call_args[1]['held'], 0)
+
+    def test_sends_timings_when_the_lock_is_not_available(self):
+        receiver = mock.Mock()
+        lock_finished.connect(receiver)
+        self.addCleanup(lock_finished.disconnect, receiver)
+        error = _operational_error('could not obtain lock', '55P03')
+        self.__connection.cursor.return_value.execute.side_effect = error
+
+        with self.assertRaises(LockNotAvailable), self.assertLogs('pyeti.eti_django.db', 'WARNING'):
+            with lock(self.__model, self.__lock, nowait=True):
+                'hello'
+
+        receiver.assert_called_once_with(
+            signal=lock_finished, sender=self.__model, lock_type=self.__lock,
+            acquired=False, waited=mock.ANY, held=None,
+        )
+
+
+class LockTimeoutTests(DjangoTestCase):
+
+    def test_times_out_when_the_table_is_locked(self):
+        errors = []
+
+        def try_lock():
+            started = time.monotonic()
+            try:
+                with lock(Placeholder, LOCK_ACCESS_EXCLUSIVE, timeout=50):
+                    pass
+            except LockNotAvailable as e:
+                errors.append((e, time.monotonic() - started))
+
+        with lock(Placeholder, LOCK_ACCESS_EXCLUSIVE), self.assertLogs('pyeti.eti_django.db', 'WARNING'):
+            _in_thread(try_lock)
+
+        self.assertEqual(1, len(errors))
+        self.assertLess(errors[0][1], 5)
+
+    def test_restores_the_lock_timeout_once_locked(self):
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL lock_timeout = '3s'")
+                with lock(Placeholder, LOCK_ACCESS_EXCLUSIVE, timeout=50):
+                    cursor.execute('SHOW lock_timeout')
+                    self.assertEqual('3s', cursor.fetchone()[0])
+                cursor.execute('SHOW lock_timeout')
+                self.assertEqual('3s', cursor.fetchone()[0])
+
+    def test_nowait_fails_when_the_table_is_locked(self):
+        errors = []
+
+        def try_lock():
+            try:
+                with lock(Placeholder, LOCK_ACCESS_EXCLUSIVE, nowait=True):
+                    pass
+            except LockNotAvailable as e:
+                errors.append(e)
+
+        with lock(Placeholder, LOCK_ACCESS_EXCLUSIVE), self.assertLogs('pyeti.eti_django.db', 'WARNING'):
+            _in_thread(try_lock)
+
+        self.assertEqual(1, len(errors))
+
+
+class AdvisoryLockKeyTests(TestCase):
+
+    def test_uses_integers_as_is(self):
+        self.assertEqual(advisory_lock_key(42), 42)
+
+    def test_hashes_strings_to_64_bit_integers(self):
+        key = advisory_lock_key('license-1')
+        self.assertEqual(key, advisory_lock_key('license-1'))
+        self.assertNotEqual(key, advisory_lock_key('license-2'))
+        self.assertTrue(-2 ** 63 <= key < 2 ** 63)
+
+    def test_rejects_integers_that_do_not_fit(self):
+        with self.assertRaises(ValueError):
+            advisory_lock_key(2 ** 63)
+
+    def test_rejects_other_types(self):
+        for key in (1.5, None, True):
+            with self.assertRaises(TypeError):
+                advisory_lock_key(key)
+
+
+class AdvisoryLockTests(TransactionTestCase):
+
+    def test_holds_the_lock_inside_the_block(self):
+        with advisory_lock('hello') as acquired:
+            self.assertTrue(acquired)
+            self.assertFalse(_try_lock_elsewhere('hello'))
+            self.assertTrue(_try_lock_elsewhere('goodbye'))
+        self.assertTrue(_try_lock_elsewhere('hello'))
+
+    def test_releases_the_lock_on_errors(self):
+        with self.assertRaises(KeyError):
+            with advisory_lock('hello'):
+                raise KeyError
+        self.assertTrue(_try_lock_elsewhere('hello'))
+
+    def test_shares_shared_locks(self):
+        with advisory_lock('hello', shared=True):
+            self.assertTrue(_try_lock_elsewhere('hello', shared=True))
+            self.assertFalse(_try_lock_elsewhere('hello'))
+
+    def test_works_as_a_decorator(self):
+        @advisory_lock(42)
+        def locked():
+            return _try_lock_elsewhere(42)
+
+        self.assertFalse(locked())
+        self.assertTrue(_try_lock_elsewhere(42))
+
+    def test_refuses_to_run_inside_a_transaction(self):
+        with transaction.atomic():
+            with self.assertRaises(TransactionManagementError):
+                with advisory_lock('hello'):
+                    pass
+            self.assertTrue(_try_lock_elsewhere('hello'))
+
+    def test_holds_transaction_locks_until_the_transaction_ends(self):
+        with transaction.atomic():
+            with advisory_xact_lock('hello') as acquired:
+                self.assertTrue(acquired)
+            self.assertFalse(_try_lock_elsewhere('hello'))
+        self.assertTrue(_try_lock_elsewhere('hello'))
+
+    def test_releases_transaction_locks_when_the_transaction_is_aborted(self):
+        with self.assertRaises(DatabaseError):
+            with advisory_xact_lock('hello'):
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1 / 0')
+        self.assertTrue(_try_lock_elsewhere('hello'))
+
+
+def _operational_error(message, sqlstate):
+    cause = Exception(message)
+    cause.sqlstate = sqlstate
+    error = OperationalError(message)
+    error.__cause__ = cause
+    return error
+
+
+def _try_lock(key, **kwargs):
+    with advisory_lock(key, wait=False, **kwargs) as acquired:
+        return acquired
+
+
+def _try_lock_elsewhere(key, **kwargs):
+    results = []
+    _in_thread(lambda: results.append(_try_lock(key, **kwargs)))
+    return results[0]
+
+
+def _in_thread(function):
+    def run():
+        try:
+            function()
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
@@ -0,0 +1,95 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+
+from pyeti.eti_django.loaders import CSVLoader, load_csv
+from pyeti.eti_django.pages.factories import PlaceholderFactory
+from pyeti.eti_django.pages.models import Placeholder
+
+
+class CSVLoaderTests(TestCase):
+
+    def test_loads_rows_into_the_model(self):
+        result = load_csv(Placeholder, io.StringIO(
+            'name,langcode,content\n'
+            ' First ,en,Hello\n'
+            'Second,es,Hola\n'
+        ))
+        self.assertEqual(2, result.created)
+        self.assertEqual([], result.errors)
+        self.assertEqual(
+            [('First', 'en', 'Hello'), ('Second', 'es', 'Hola')],
+            list(Placeholder.objects.order_by('name').values_list('name', 'langcode', 'content')),
+        )
+
+    def test_loads_from_a_path(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        path = os.path.join(tmpdir.name, 'placeholders.csv')
+        with open(path, 'w') as file_:
+            file_.write('name,langcode\nFirst,en\n')
+
+        self.assertEqual(1, load_csv(Placeholder, path).created)
+
+    def test_matches_headers_by_verbose_name_and_field_map(self):
+        result = load_csv(
+            Placeholder,
+            io.StringIO('Title,Language,Body\nFirst,en,Hello\n'),
+            field_map={'Title': 'name', 'Body': 'content'},
+        )
+        self.assertEqual(1, result.created)
+        self.assertEqual(('First', 'en', 'Hello'), Placeholder.objects.values_list('name', 'langcode', 'content').get())
+
+    def test_ignores_unknown_columns(self):
+        result = load_csv(Placeholder, io.StringIO('name,unknown\nFirst,whatever\n'))
+        self.assertEqual(1, result.created)
+        self.assertEqual(['unknown'], result.ignored_columns)
+
+    def test_inserts_in_batches(self):
+        rows = ''.join('Placeholder %d,en\n' % i for i in range(5))
+        with mock.patch.object(Placeholder.objects, 'bulk_create', wraps=Placeholder.objects.bulk_create) as bulk_create:
+            result = CSVLoader(Placeholder, batch_size=2).load(io.StringIO('name,langcode\n' + rows))
+        self.assertEqual(5, result.created)
+        self.assertEqual(3, bulk_create.call_count)
+
+    def test_collects_rows_with_the_wrong_number_of_columns(self):
+        result = load_csv(Placeholder, io.StringIO('name,langcode\nFirst\nSecond,en\n'))
+        self.assertEqual(1, result.created)
+        self.assertEqual([2], [error.line_number for error in result.errors])
+        self.assertEqual(['First'], result.errors[0].row)
+
+    def test_isolates_rows_that_fail_to_insert(self):
+        PlaceholderFactory(name='Existing', langcode='en')
+        result = load_csv(Placeholder, io.StringIO(
+            'name,langcode\n'
+            'First,en\n'
+            'Existing,en\n'
+            'Second,en\n'
+        ))
+        self.assertEqual(2, result.created)
+        self.assertEqual([3], [error.line_number for error in result.errors])
+        self.assertEqual(3, Placeholder.objects.count())
+
+    def test_copies_rows_on_postgresql(self):
+        result = load_csv(
+            Placeholder,
+            io.StringIO('name,langcode,content\nFirst,en,"Hello, there"\nSecond,es,\n'),
+            use_copy=True,
+        )
+        self.assertEqual(2, result.created)
+        first = Placeholder.objects.get(name='First')
+        self.assertEqual('Hello, there', first.content)
+        self.assertIsNotNone(first.created_at)
+
+    def test_isolates_failures_when_copying(self):
+        PlaceholderFactory(name='Existing', langcode='en')
+        result = load_csv(Placeholder, io.StringIO('name,langcode\nFirst,en\nExisting,en\n'), use_copy=True)
+        self.assertEqual(1, result.created)
+        self.assertEqual([3], [error.line_number for error in result.errors])
+
+    def test_handles_empty_files(self):
+        result = load_csv(Placeholder, io.StringIO(''))
+        self.assertEqual(0, result.created)
@@ -1,10 +1,14 @@
+from datetime import timedelta
 from unittest import TestCase, mock
 
 from django.db import models
 from django.db.utils import ProgrammingError
 from faker import Faker
 
-from pyeti.eti_django.tokens import HasSecureTokenMixin, TokenGenerator
+from pyeti.eti_django.tokens import (
+    BulkTokenGenerator, ExpiringTokenGenerator, HasSecureTokenMixin,
+    SecureTokenQuerySet, TokenGenerator, parse_lookup_token,
+)
 
 faker = Faker()
 
@@ -52,6 +56,169 @@ class TokenGeneratorTests(TestCase):
         )
 
 
+class LookupTokenTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__record = _Tokenable(pk=42, token_hash='hello')  # noqa: S106
+
+    def test_carries_the_primary_key(self):
+        token = self.__record.token.lookup_token()
+        self.assertEqual(('42', self.__record.token()), parse_lookup_token(token))
+
+    def test_rejects_malformed_tokens(self):
+        for token in ['', 'abc', '-abc', 'abc-', '!!!-abc']:
+            with self.subTest(token=token):
+                self.assertIsNone(parse_lookup_token(token))
+
+
+@mock.patch.object(SecureTokenQuerySet, 'filter')
+class FindByTokenTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__record = _Tokenable(pk=42, token_hash='hello')  # noqa: S106
+        self.__subject = SecureTokenQuerySet(model=_Tokenable)
+
+    def test_finds_the_record_by_primary_key(self, mock_filter):
+        mock_filter.return_value.first.return_value = self.__record
+        self.assertIs(self.__record, self.__subject.find_by_token(self.__record.token.lookup_token()))
+        mock_filter.assert_called_once_with(pk='42')
+
+    def test_returns_none_for_invalid_tokens(self, mock_filter):
+        mock_filter.return_value.first.return_value = self.__record
+        token = self.__record.token.lookup_token()[:-1] + 'x'
+        self.assertIsNone(self.__subject.find_by_token(token))
+
+    def test_returns_none_if_the_record_does_not_exist(self, mock_filter):
+        mock_filter.return_value.first.return_value = None
+        self.assertIsNone(self.__subject.find_by_token(self.__record.token.lookup_token()))
+
+    def test_returns_none_for_malformed_tokens(self, mock_filter):
+        self.assertIsNone(self.__subject.find_by_token('not a token'))
+        mock_filter.assert_not_called()
+
+    def test_returns_none_for_primary_keys_of_the_wrong_type(self, mock_filter):
+        mock_filter.side_effect = ValueError
+        self.assertIsNone(self.__subject.find_by_token(self.__record.token.lookup_token()))
+
+    def test_is_available_on_the_model(self, mock_filter):
+        with mock.patch.object(_Tokenable._default_manager, 'filter') as manager_filter:
+            manager_filter.return_value.first.return_value = self.__record
+            self.assertIs(self.__record, _Tokenable.find_by_token(self.__record.token.lookup_token()))
+        manager_filter.assert_called_once_with(pk='42')
+
+
+class BulkTokenGeneratorTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = mock.patch('pyeti.eti_django.tokens.settings')
+        _mock_settings = patcher.start()
+        _mock_settings.SECRET_KEY = 'secret'  # noqa: S105
+        self.addCleanup(patcher.stop)
+
+        self.__records = [_Tokenable(token_hash=faker.pystr()) for _ in range(5)]
+        self.__subject = BulkTokenGenerator(_Tokenable, 'token_hash')
+
+    def test_generates_the_same_tokens_as_token_generator(self):
+        self.assertEqual(
+            [TokenGenerator(record, 'token_hash').generate() for record in self.__records],
+            self.__subject.generate(self.__records),
+        )
+
+    def test_generates_an_appropriate_token(self):
+        self.assertEqual('f15f486e6d87d4250297', self.__subject.generate_one(_Tokenable(token_hash='hello')))  # noqa: S106
+
+    def test_validates_tokens(self):
+        tokens = self.__subject.generate(self.__records)
+        tokens[1] = 'invalid_token'  # noqa: S105
+        self.assertEqual(
+            [True, False, True, True, True],
+            self.__subject.validate(zip(self.__records, tokens)),
+        )
+
+    @mock.patch('pyeti.eti_django.tokens.crypto')
+    def test_validates_securely(self, mock_crypto):
+        token = faker.word()
+        self.__subject.validate([(self.__records[0], token)])
+        mock_crypto.constant_time_compare.assert_called_once_with(
+            self.__subject.generate_one(self.__records[0]), token
+        )
+
+    def test_derives_the_key_once(self):
+        tokens = self.__subject.generate(self.__records)
+        with mock.patch('pyeti.eti_django.tokens.settings') as mock_settings:
+            mock_settings.SECRET_KEY = 'other'  # noqa: S105
+            self.assertEqual(tokens, self.__subject.generate(self.__records))
+
+
+class ExpiringTokenGeneratorTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        patcher = mock.patch('pyeti.eti_django.tokens.time.time', return_value=1000000000)
+        self.__mock_time = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.__subject = ExpiringTokenGenerator('test', timedelta(hours=1), secrets=['new', 'old'])
+
+    def test_validates_tokens(self):
+        token = self.__subject.generate('hello')
+        self.assertTrue(self.__subject.validate('hello', token))
+        self.assertFalse(self.__subject.validate('goodbye', token))
+
+    def test_tokens_are_compact(self):
+        self.assertLessEqual(len(self.__subject.generate('hello')), 29)
+
+    def test_expires_tokens(self):
+        token = self.__subject.generate('hello')
+        self.__mock_time.return_value += 3600
+        self.assertTrue(self.__subject.validate('hello', token))
+        self.__mock_time.return_value += 1
+        self.assertFalse(self.__subject.validate('hello', token))
+
+    def test_rejects_tokens_from_the_future(self):
+        token = self.__subject.generate('hello')
+        self.__mock_time.return_value -= 1
+        self.assertFalse(self.__subject.validate('hello', token))
+
+    def test_validates_tokens_signed_with_old_secrets(self):
+        token = ExpiringTokenGenerator('test', 3600, secrets=['old']).generate('hello')
+        self.assertTrue(self.__subject.validate('hello', token))
+        self.assertFalse(ExpiringTokenGenerator('test', 3600, secrets=['other']).validate('hello', token))
+
+    def test_signs_with_the_first_secret(self):
+        token = self.__subject.generate('hello')
+        self.assertTrue(ExpiringTokenGenerator('test', 3600, secrets=['new']).validate('hello', token))
+        self.assertFalse(ExpiringTokenGenerator('test', 3600, secrets=['old']).validate('hello', token))
+
+    def test_separates_tokens_by_salt(self):
+        token = self.__subject.generate('hello')
+        self.assertFalse(ExpiringTokenGenerator('other', 3600, secrets=['new']).validate('hello', token))
+
+    @mock.patch('pyeti.eti_django.tokens.crypto')
+    def test_rejects_malformed_tokens_without_signing(self, mock_crypto):
+        token = self.__subject.generate('hello')
+        timestamp, signature = token.split('-')
+        for malformed in (
+            None, '', '-', token + 'a', signature, timestamp + '-' + signature.upper(),
+            '+' + timestamp[1:] + '-' + signature, timestamp + '-' + signature[:-1] + 'g',
+            'zzzzzzzzz-' + signature,
+        ):
+            self.assertFalse(self.__subject.validate('hello', malformed), malformed)
+        mock_crypto.constant_time_compare.assert_not_called()
+
+    @mock.patch('pyeti.eti_django.tokens.settings')
+    def test_defaults_to_the_secret_key_and_fallbacks(self, mock_settings):
+        mock_settings.SECRET_KEY = 'new'  # noqa: S105
+        mock_settings.SECRET_KEY_FALLBACKS = ['old']
+        token = ExpiringTokenGenerator('test', 3600, secrets=['old']).generate('hello')
+        self.assertTrue(ExpiringTokenGenerator('test', 3600).validate('hello', token))
+
+
 class HasSecureTokenMixinTests(TestCase):
 
     def setUp(self):
@@ -61,6 +228,13 @@ class HasSecureTokenMixinTests(TestCase):
     def test_adds_a_token_property(self):
         self.assertIsInstance(self.__subject.token, TokenGenerator)
 
+    def test_adds_a_bulk_token_generator(self):
+        self.assertIsInstance(_Tokenable.token_generator(), BulkTokenGenerator)
+
+    def test_does_not_add_a_manager(self):
+        self.assertFalse(hasattr(_ManagedTokenable, 'objects'))
+        self.assertIs(_ManagedTokenable.active, _ManagedTokenable._default_manager)
+
     def test_generates_a_token_hash_on_save(self):
         self.assertFalse(self.__subject.token_hash)
         try:
@@ -85,3 +259,11 @@ class _Tokenable(HasSecureTokenMixin, models.Model):
 
     class Meta:
         app_label = 'pyeti.eti_django'
+
+
+class _ManagedTokenable(HasSecureTokenMixin, models.Model):
+
+    active = models.Manager()
+
+    class Meta:
+        app_label = 'pyeti.eti_django'
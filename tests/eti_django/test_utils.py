@@ -5,7 +5,9 @@ from django.contrib.postgres.fields import ArrayField
 from django.db import models
 from faker import Faker
 
-from pyeti.eti_django.utils import typecast_from_field
+from pyeti.eti_django.utils import (
+    compile_typecaster, typecast_from_field, typecast_rows,
+)
 
 faker = Faker()
 
@@ -109,3 +111,86 @@ class TypecastingFromFieldTests(TestCase):
         field_options = options
         field.deconstruct.return_value = [field_options]
         return field
+
+
+class CompileTypecasterTests(TestCase):
+
+    def test_casts_like_typecast_from_field(self):
+        cases = [
+            (_mock_field(field_class=models.BooleanField), 'yes'),
+            (_mock_field(field_class=models.CharField), '  hello '),
+            (_mock_field(field_class=models.DateField), '2011-11-12'),
+            (_mock_field(field_class=models.FloatField), '4.5'),
+            (_mock_field(field_class=models.IntegerField), '4'),
+            (_mock_field(field_class=models.IntegerField, null=True), '  '),
+            (_mock_field(field_class=_FakeField), 'hello'),
+        ]
+
+        for field, value in cases:
+            with self.subTest(value=value):
+                self.assertEqual(compile_typecaster(field)(value), typecast_from_field(field, value))
+
+    def test_inspects_the_field_only_once(self):
+        field = _mock_field(field_class=models.IntegerField)
+        cast = compile_typecaster(field)
+        for value in ['1', '2', '3']:
+            cast(value)
+        field.deconstruct.assert_called_once_with()
+
+    def test_returns_non_string_values_immediately(self):
+        value = object()
+        self.assertIs(compile_typecaster(_mock_field())(value), value)
+
+    def test_maps_choice_labels_to_values(self):
+        field = _mock_field(field_class=models.IntegerField, choices=[(1, 'Hello'), (2, 'There'), (3, 'Hello')])
+        cast = compile_typecaster(field)
+        self.assertEqual(cast('Hello'), 1)
+        self.assertEqual(cast('There'), 2)
+        self.assertEqual(cast('4'), 4)
+
+    def test_casts_blank_strings_before_matching_choices(self):
+        field = _mock_field(field_class=models.CharField, null=True, choices=[('', '')])
+        self.assertIsNone(compile_typecaster(field)(''))
+
+    def test_binds_array_field_base_casters(self):
+        base_field = _mock_field(field_class=models.CharField, choices=[(1, 'Hello'), (2, 'There')])
+        field = _mock_field(field_class=ArrayField, base_field=base_field)
+        cast = compile_typecaster(field)
+        self.assertEqual(cast('Hello,There'), [1, 2])
+        self.assertEqual(cast(''), [])
+        base_field.deconstruct.assert_called_once_with()
+
+
+class TypecastRowsTests(TestCase):
+
+    def test_typecasts_each_column_with_its_field(self):
+        model = mock.Mock()
+        fields = {
+            'name': _mock_field(field_class=models.CharField),
+            'age': _mock_field(field_class=models.IntegerField, null=True),
+        }
+        model._meta.get_field.side_effect = fields.get
+
+        rows = typecast_rows(model, ['name', 'age'], [[' Bob ', '40'], ['Alice', '']])
+
+        self.assertEqual(
+            [{'name': 'Bob', 'age': 40}, {'name': 'Alice', 'age': None}],
+            list(rows),
+        )
+        fields['age'].deconstruct.assert_called_once_with()
+
+    def test_raises_for_ragged_rows(self):
+        model = mock.Mock()
+        model._meta.get_field.return_value = _mock_field()
+
+        for row in (['Bob'], ['Bob', '40', 'extra']):
+            with self.subTest(row=row), self.assertRaises(ValueError):
+                list(typecast_rows(model, ['name', 'age'], [row]))
+
+
+def _mock_field(field_class=models.CharField, **options):
+    options.setdefault('null', False)
+
+    field = mock.Mock(spec=field_class)
+    field.deconstruct.return_value = [options]
+    return field
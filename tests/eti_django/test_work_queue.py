@@ -0,0 +1,100 @@
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from pyeti.eti_django.db import claim_batches
+from pyeti.eti_django.models import WorkQueueQuerySet
+from pyeti.eti_django.pages.factories import PlaceholderFactory
+from pyeti.eti_django.pages.models import Placeholder
+
+
+class ClaimBatchesTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__placeholders = PlaceholderFactory.create_batch(5)
+
+    def test_processes_every_row_in_batches(self):
+        batches = []
+        self.assertEqual(5, claim_batches(Placeholder.objects.order_by('-name'), batches.append, 2))
+        self.assertEqual([2, 2, 1], [len(batch) for batch in batches])
+        self.assertEqual(
+            sorted(placeholder.pk for placeholder in self.__placeholders),
+            [placeholder.pk for batch in batches for placeholder in batch],
+        )
+
+    def test_keeps_the_work_done_on_each_batch(self):
+        claim_batches(Placeholder.objects.all(), _mark_done, 2)
+        self.assertFalse(Placeholder.objects.exclude(content='done').exists())
+
+    def test_rolls_back_only_the_failed_batch(self):
+        def process(batch):
+            _mark_done(batch)
+            if Placeholder.objects.filter(content='done').count() > 2:
+                raise KeyError
+
+        with self.assertRaises(KeyError):
+            claim_batches(Placeholder.objects.all(), process, 2)
+        self.assertEqual(2, Placeholder.objects.filter(content='done').count())
+
+    def test_stops_after_a_batch_returns_false(self):
+        def process(batch):
+            _mark_done(batch)
+            return False
+
+        self.assertEqual(2, claim_batches(Placeholder.objects.all(), process, 2))
+        self.assertEqual(2, Placeholder.objects.filter(content='done').count())
+
+    def test_is_available_on_the_queryset(self):
+        batches = []
+        WorkQueueQuerySet(Placeholder).claim_batches(batches.append, 10)
+        self.assertEqual([5], [len(batch) for batch in batches])
+
+
+class ConcurrentClaimBatchesTests(TransactionTestCase):
+
+    def test_skips_rows_claimed_by_other_workers(self):
+        PlaceholderFactory.create_batch(4)
+        claimed = []
+        claimed_elsewhere = []
+
+        def other_worker():
+            try:
+                claim_batches(
+                    Placeholder.objects.all(),
+                    lambda batch: claimed_elsewhere.extend(placeholder.pk for placeholder in batch),
+                    10,
+                )
+            finally:
+                connection.close()
+
+        def process(batch):
+            claimed.extend(placeholder.pk for placeholder in batch)
+            thread = threading.Thread(target=other_worker)
+            thread.start()
+            thread.join()
+            return False
+
+        claim_batches(Placeholder.objects.all(), process, 2)
+
+        self.assertEqual(2, len(claimed_elsewhere))
+        self.assertFalse(set(claimed) & set(claimed_elsewhere))
+
+    def test_processes_each_batch_in_its_own_transaction(self):
+        PlaceholderFactory.create_batch(4)
+
+        def process(batch):
+            self.assertTrue(connection.in_atomic_block)
+            _mark_done(batch)
+            if Placeholder.objects.filter(content='done').count() > 2:
+                raise KeyError
+
+        with self.assertRaises(KeyError):
+            claim_batches(Placeholder.objects.all(), process, 2)
+        self.assertFalse(connection.in_atomic_block)
+        self.assertEqual(2, Placeholder.objects.filter(content='done').count())
+
+
+def _mark_done(batch):
+    Placeholder.objects.filter(pk__in=[placeholder.pk for placeholder in batch]).update(content='done')
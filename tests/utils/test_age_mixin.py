@@ -1,9 +1,9 @@
 from datetime import date
-from unittest import TestCase, mock
+from unittest import TestCase, mock, skipIf
 
 from faker import Faker
 
-from pyeti.utils import AgeMixin
+from pyeti.utils import AgeMixin, ages_on, numpy
 
 fake = Faker()
 
@@ -58,3 +58,33 @@ class _AgeMixinImplementation(AgeMixin):
     def __init__(self, birth_date=None, attr=AgeMixin.BIRTH_DATE_FIELD):
         self.birth_date = birth_date
         self.BIRTH_DATE_FIELD = attr
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class AgesOnTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__date = date(2018, 4, 1)
+
+    def test_returns_the_same_ages_as_age_on(self):
+        birth_dates = [date(1953, 3, 31), date(1953, 5, 21), date(2018, 4, 1), date(2018, 3, 31), date(2000, 2, 29)]
+        obj = _AgeMixinImplementation()
+        expected = []
+        for birth_date in birth_dates:
+            obj.birth_date = birth_date
+            expected.append(obj.age_on(self.__date))
+
+        result = ages_on(numpy.array(birth_dates, dtype='datetime64[D]'), self.__date)
+
+        self.assertEqual(numpy.int64, result.dtype)
+        self.assertEqual(expected, result.tolist())
+
+    def test_returns_nan_for_missing_birth_dates(self):
+        result = ages_on(numpy.array(['1953-03-31', 'NaT'], dtype='datetime64[D]'), self.__date)
+        self.assertEqual(65, result[0])
+        self.assertTrue(numpy.isnan(result[1]))
+
+    def test_raises_if_a_birth_date_is_in_the_future(self):
+        with self.assertRaises(ValueError):
+            ages_on(numpy.array(['2018-09-04'], dtype='datetime64[D]'), self.__date)
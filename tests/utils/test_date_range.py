@@ -0,0 +1,121 @@
+from collections.abc import Iterator
+from datetime import date, timedelta
+from unittest import TestCase, skipIf
+
+from pyeti.datetime_utils import MONTHS, WEEKS, DateRange, numpy
+
+
+class DateRangeTests(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.__start = date(2019, 1, 1)
+        self.__end = date(2019, 1, 30)
+
+    def test_includes_every_day_by_default(self):
+        days = DateRange(self.__start, self.__end)
+        self.assertEqual(30, len(days))
+        self.assertEqual(self.__start, days[0])
+        self.assertEqual(self.__end, days[-1])
+
+    def test_is_lazily_iterable(self):
+        self.assertIsInstance(iter(DateRange(self.__start, self.__end)), Iterator)
+
+    def test_ends_today_by_default(self):
+        days = DateRange(date.today() - timedelta(days=29))
+        self.assertEqual(30, len(days))
+
+    def test_is_empty_when_end_is_before_start(self):
+        days = DateRange(self.__end, self.__start)
+        self.assertEqual(0, len(days))
+        self.assertEqual([], list(days))
+
+    def test_steps_by_days(self):
+        days = DateRange(self.__start, self.__end, step=10)
+        self.assertEqual([date(2019, 1, 1), date(2019, 1, 11), date(2019, 1, 21)], list(days))
+
+    def test_steps_by_weeks(self):
+        weeks = DateRange(self.__start, self.__end, unit=WEEKS)
+        self.assertEqual(
+            [date(2019, 1, 1), date(2019, 1, 8), date(2019, 1, 15), date(2019, 1, 22), date(2019, 1, 29)],
+            list(weeks),
+        )
+
+    def test_steps_by_months_clamping_to_the_end_of_the_month(self):
+        months = DateRange(date(2019, 11, 30), date(2020, 3, 30), unit=MONTHS)
+        self.assertEqual(
+            [date(2019, 11, 30), date(2019, 12, 30), date(2020, 1, 30), date(2020, 2, 29), date(2020, 3, 30)],
+            list(months),
+        )
+        self.assertEqual(5, len(months))
+
+    def test_filters_business_days_and_holidays(self):
+        days = DateRange(date(2019, 7, 1), date(2019, 7, 14), business_days=True, holidays=[date(2019, 7, 4)])
+        expected = [
+            date(2019, 7, 1), date(2019, 7, 2), date(2019, 7, 3), date(2019, 7, 5),
+            date(2019, 7, 8), date(2019, 7, 9), date(2019, 7, 10), date(2019, 7, 11), date(2019, 7, 12),
+        ]
+        self.assertEqual(expected, list(days))
+        self.assertEqual(len(expected), len(days))
+        self.assertEqual(date(2019, 7, 8), days[4])
+        self.assertIn(date(2019, 7, 5), days)
+        self.assertNotIn(date(2019, 7, 4), days)
+        self.assertNotIn(date(2019, 7, 6), days)
+
+    def test_matches_filtered_days_over_long_ranges(self):
+        start, end = date(2016, 1, 1), date(2020, 12, 31)
+        holidays = [date(year, 12, 25) for year in range(2016, 2021)] + [date(year, 7, 4) for year in range(2016, 2021)]
+        expected = [
+            start + timedelta(days=i) for i in range((end - start).days + 1)
+            if (start + timedelta(days=i)).weekday() < 5 and start + timedelta(days=i) not in holidays
+        ]
+        days = DateRange(start, end, business_days=True, holidays=holidays)
+        self.assertEqual(len(expected), len(days))
+        for index in [0, 1, 100, 500, 1000, -1]:
+            self.assertEqual(expected[index], days[index])
+        self.assertEqual(expected[::3], list(days[::3]))
+
+    def test_iterates_in_reverse(self):
+        days = DateRange(self.__start, self.__end, step=10)
+        expected = [date(2019, 1, 21), date(2019, 1, 11), date(2019, 1, 1)]
+        self.assertEqual(expected, list(reversed(days)))
+        self.assertEqual(expected, list(days.reverse()))
+
+    def test_slices_into_another_range(self):
+        days = DateRange(self.__start, self.__end)[5:20:7]
+        self.assertIsInstance(days, DateRange)
+        self.assertEqual([date(2019, 1, 6), date(2019, 1, 13), date(2019, 1, 20)], list(days))
+        self.assertEqual(3, len(days))
+
+    def test_slices_are_bounded_by_their_own_dates(self):
+        days = DateRange(self.__start, self.__end)[5:20:7]
+        self.assertEqual((date(2019, 1, 6), date(2019, 1, 20)), (days.start, days.end))
+        self.assertEqual('<DateRange 2019-01-06 to 2019-01-20, 3 days>', repr(days))
+        self.assertIn(date(2019, 1, 13), days)
+        self.assertNotIn(date(2019, 1, 7), days)
+        self.assertEqual([date(2019, 1, 13)], list(days[1:2]))
+
+        newest_first = DateRange(self.__start, self.__end).reverse()
+        self.assertEqual((self.__end, self.__start), (newest_first.start, newest_first.end))
+
+    def test_checks_membership_without_iterating(self):
+        weeks = DateRange(self.__start, self.__end, unit=WEEKS)
+        self.assertIn(date(2019, 1, 8), weeks)
+        self.assertNotIn(date(2019, 1, 9), weeks)
+        self.assertNotIn(date(2019, 2, 5), weeks)
+
+    def test_rejects_invalid_arguments(self):
+        self.assertRaises(ValueError, DateRange, self.__start, self.__end, unit='years')
+        self.assertRaises(ValueError, DateRange, self.__start, self.__end, step=0)
+        self.assertRaises(ValueError, DateRange, self.__start, self.__end, unit=WEEKS, business_days=True)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_converts_to_a_numpy_array(self):
+        for days in [
+            DateRange(self.__start, self.__end, step=3),
+            DateRange(self.__start, self.__end, unit=WEEKS)[::-1],
+            DateRange(self.__start, self.__end, business_days=True),
+        ]:
+            array = days.to_numpy()
+            self.assertEqual(numpy.dtype('datetime64[D]'), array.dtype)
+            self.assertEqual(list(days), array.astype(object).tolist())
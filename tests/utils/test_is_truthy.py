@@ -0,0 +1,63 @@
+from unittest import TestCase, skipIf
+
+from pyeti.utils import (
+    UnrecognizedBooleanError, is_truthy, numpy, truthy_column,
+)
+
+
+class _Str(str):
+    pass
+
+
+_VALUES = [
+    'y', 'Y', 'yes', 'YES', 'Yes', ' yes ', 'true', 'True', 'TRUE', 'tRuE', '1',
+    'n', 'N', 'no', 'No', 'false', 'False', ' FALSE', '0', '', '   ',
+    'maybe', True, False, 1, 0, 2, None, [], ['x'], _Str('no'),
+]
+
+
+class IsTruthyTests(TestCase):
+
+    def test_converts_yes_and_no_strings(self):
+        for value in ['y', 'YES', ' true ', '1']:
+            self.assertIs(True, is_truthy(value))
+        for value in ['n', 'No', ' false', '0', '']:
+            self.assertIs(False, is_truthy(value))
+
+    def test_falls_back_to_bool(self):
+        self.assertIs(True, is_truthy('maybe'))
+        self.assertIs(False, is_truthy(None))
+        self.assertIs(True, is_truthy(1))
+
+
+class TruthyColumnTests(TestCase):
+
+    def test_matches_is_truthy_for_each_value(self):
+        self.assertEqual([is_truthy(value) for value in _VALUES], truthy_column(_VALUES))
+
+    def test_accepts_iterables(self):
+        self.assertEqual([True, False], truthy_column(iter(['yes', 'no'])))
+
+    def test_strict_mode_converts_recognized_values(self):
+        self.assertEqual(
+            [True, True, False, False, True, False, False],
+            truthy_column(['Yes', ' TRUE ', 'n', '', True, 0, _Str('no')], strict=True),
+        )
+
+    def test_strict_mode_reports_unrecognized_values(self):
+        with self.assertRaises(UnrecognizedBooleanError) as context:
+            truthy_column(['yes', 'maybe', None, 1, 2], strict=True)
+        self.assertEqual([(1, 'maybe'), (2, None), (4, 2)], context.exception.values)
+        self.assertIsInstance(context.exception, ValueError)
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_accepts_and_returns_numpy_arrays(self):
+        values = numpy.array(['yes', 'no', None, 'True'], dtype=object)
+        result = truthy_column(values, as_array=True)
+        self.assertEqual(bool, result.dtype)
+        self.assertEqual([True, False, False, True], result.tolist())
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_strict_mode_accepts_numpy_booleans(self):
+        values = numpy.array([True, False], dtype=object).astype(bool)
+        self.assertEqual([True, False], truthy_column(values, strict=True))
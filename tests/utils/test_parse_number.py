@@ -0,0 +1,75 @@
+from decimal import Decimal
+from unittest import TestCase
+
+from pyeti.utils import parse_number
+
+
+class ParseNumberTests(TestCase):
+
+    def test_parses_plain_numbers(self):
+        tests = {
+            '4': 4, '-4': -4, '+4': 4, ' 4 ': 4, '4.25': 4.25, '-.5': -0.5,
+            '4.': 4.0, '1.5e3': 1500.0, '1.5E-2': 0.015, '1e5': 100000.0,
+        }
+
+        for value, expected in tests.items():
+            with self.subTest(value=value):
+                result = parse_number(value)
+                self.assertEqual(expected, result)
+                self.assertIs(type(expected), type(result))
+
+    def test_removes_group_separators(self):
+        self.assertEqual(1234567, parse_number('1,234,567'))
+        self.assertEqual(100000, parse_number('1,00,000'))
+        self.assertEqual(-1234.5, parse_number('-1,234.5'))
+
+    def test_understands_other_locales(self):
+        self.assertEqual(1234.56, parse_number('1.234,56', decimal_separator=',', group_separator='.'))
+        self.assertEqual(1234.5, parse_number('1 234,5', decimal_separator=',', group_separator=' '))
+        self.assertEqual(1234, parse_number("1'234", group_separator="'"))
+
+    def test_does_not_mistake_decimal_separators_for_group_separators(self):
+        self.assertRaises(ValueError, parse_number, '1.234,56')
+
+    def test_strips_currency_symbols(self):
+        tests = {
+            '$1,200.50': 1200.5, '-$5': -5, '$-5': -5, '12 €': 12, '£ 3': 3,
+            '¥300': 300, '₹1,00,000': 100000,
+        }
+
+        for value, expected in tests.items():
+            with self.subTest(value=value):
+                self.assertEqual(expected, parse_number(value))
+
+    def test_parses_percentages(self):
+        self.assertEqual(0.125, parse_number('12.5%'))
+        self.assertEqual(0.5, parse_number('50 %'))
+
+    def test_parses_parenthesized_negatives(self):
+        self.assertEqual(-1200, parse_number('(1,200)'))
+        self.assertEqual(-45.0, parse_number('($45.00)'))
+        self.assertEqual(-0.035, parse_number('(3.5%)'))
+
+    def test_returns_decimals_if_asked(self):
+        self.assertEqual(Decimal('1234.56'), parse_number('$1,234.56', use_decimal=True))
+        self.assertEqual(Decimal('0.125'), parse_number('12.5%', use_decimal=True))
+        self.assertEqual(4, parse_number('4', use_decimal=True))
+
+    def test_raises_for_non_numbers(self):
+        for value in ['', ' ', '-', '.', 'abc', '1,,2', ',12', '1e', '1.2.3', '12abc', '$', '()']:
+            with self.subTest(value=value):
+                self.assertRaises(ValueError, parse_number, value)
+
+    def test_raises_for_more_than_one_sign(self):
+        for value in ['(-5)', '(+5)', '-$-5', '+-5', '($-5)']:
+            with self.subTest(value=value):
+                self.assertRaises(ValueError, parse_number, value)
+
+    def test_raises_for_values_that_are_not_strings_or_numbers(self):
+        for value in [None, True, False, b'12', ['12']]:
+            with self.subTest(value=value):
+                self.assertRaises(ValueError, parse_number, value)
+
+    def test_returns_numbers_unchanged(self):
+        for value in [4, 4.5, Decimal('4.5')]:
+            self.assertIs(value, parse_number(value))
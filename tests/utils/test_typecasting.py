@@ -1,8 +1,8 @@
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
 from faker import Faker
 
-from pyeti.utils import typecast_guess
+from pyeti.utils import numpy, typecast_column, typecast_guess
 
 faker = Faker()
 
@@ -33,3 +33,47 @@ class TypecastingGuessTests(TestCase):
         for value, result in list(conversions.items()):
             with self.subTest(value=value, result=result):
                 self.assertEqual(typecast_guess(value), result)
+
+
+class TypecastColumnTests(TestCase):
+
+    def test_matches_typecast_guess_for_each_value(self):
+        outliers = [
+            '', '  ', 'NA', 'n/a', 'None', '1,234', ' 5 ', '4.', '4.5e3',
+            '+.5', '-.5', '1.2.3', 'hello', '  hello ', '4\n', 7, None,
+        ]
+        columns = [
+            ['1', '-2', '30'] + outliers,
+            ['1.5', '-2.25', '.3', '4'] + outliers,
+            ['a', 'b', 'c'] + outliers,
+        ]
+
+        for column in columns:
+            with self.subTest(column=column[0]):
+                result = typecast_column(column, sample_size=3)
+                expected = [typecast_guess(value) for value in column]
+                self.assertEqual(expected, result)
+                self.assertEqual([type(v) for v in expected], [type(v) for v in result])
+
+    def test_accepts_iterables(self):
+        self.assertEqual([1, 2], typecast_column(iter(['1', '2'])))
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_returns_integer_arrays(self):
+        result = typecast_column(['1', '2', '3'], as_array=True)
+        self.assertEqual(numpy.int64, result.dtype)
+        self.assertEqual([1, 2, 3], result.tolist())
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_returns_float_arrays_with_nan_for_nulls(self):
+        result = typecast_column(['1.5', 'NA', '3'], as_array=True)
+        self.assertEqual(numpy.float64, result.dtype)
+        self.assertEqual(1.5, result[0])
+        self.assertTrue(numpy.isnan(result[1]))
+        self.assertEqual(3.0, result[2])
+
+    @skipIf(numpy is None, 'NumPy is not installed')
+    def test_returns_object_arrays_for_other_columns(self):
+        result = typecast_column(['1', 'hello'], as_array=True)
+        self.assertEqual(object, result.dtype)
+        self.assertEqual([1, 'hello'], result.tolist())